@@ -1,13 +1,46 @@
 #!/usr/bin/env python3
 
-import base64
 import struct
 import json
+import mmap
 import argparse
-from typing import Dict, Any, Tuple
+import array
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+from functools import lru_cache
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
-def load_register_definitions() -> Dict[int, Any]:
-    """Load register definitions from JSON file."""
+try:
+    # SIMD-accelerated decoder, if installed
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
+# Pre-compiled unpackers; unpack_from reads in place without slicing the buffer
+_U16LE = struct.Struct('<H').unpack_from
+_F32LE = struct.Struct('<f').unpack_from
+_U8 = struct.Struct('<B').unpack_from
+
+# Unpacker and frame size in bytes per datatype; unknown types decode as uint16
+_DATATYPES = {
+    'uint16': (_U16LE, 2),
+    'float': (_F32LE, 4),
+    'uint8': (_U8, 2),
+}
+
+# Maps printable ASCII bytes to themselves and everything else to '.'
+_ASCII_MAP = bytes(b if 32 <= b <= 126 else ord('.') for b in range(256))
+
+@lru_cache(maxsize=1)
+def load_register_definitions() -> Tuple[Dict[int, Any], List[Optional[Callable]]]:
+    """Load register definitions from JSON file.
+
+    Returns the definitions keyed by register number together with a dispatch
+    table, indexed by register number, of parsers built by _build_parser.
+    The result is cached, so repeated calls do not re-read the JSON file.
+    """
     with open('doc/eg4_registers.json', 'r') as f:
         data = json.load(f)
         # Create a dictionary mapping register numbers to their definitions
@@ -27,22 +60,42 @@ def load_register_definitions() -> Dict[int, Any]:
                         # Add range information
                         reg['is_input'] = input_range['min'] <= reg_num <= input_range['max']
                         reg['is_hold'] = hold_range['min'] <= reg_num <= hold_range['max']
+                        # Convert the scale once here rather than per decoded value
+                        reg['unit_scale'] = float(reg['unit_scale']) if 'unit_scale' in reg else None
+                        # Pre-format the constant parts of this register's output line
+                        reg['_line_prefix'] = f"Register {reg_num} ({reg['register_type']}) ({reg.get('description', 'Unknown')})"
+                        reg['_line_suffix'] = f" {reg.get('unit', '')}"
                         registers[reg_num] = reg
         print(f"Loaded {len(registers)} register definitions")
-        return registers
+
+        dispatch = [None] * (max(registers, default=-1) + 1)
+        # Plain registers with the same datatype and scale share one parser
+        shared = {}
+        for reg_num, reg in registers.items():
+            shape = None
+            if 'num_values' not in reg and 'value_map' not in reg:
+                shape = (reg.get('datatype', 'uint16'), reg['unit_scale'])
+            # Plain uint16 registers are read straight from the pre-decoded words
+            reg['_plain_u16'] = shape is not None and _DATATYPES.get(shape[0], _DATATYPES['uint16'])[0] is _U16LE
+            if shape in shared:
+                dispatch[reg_num], reg['_size'] = shared[shape]
+                continue
+            dispatch[reg_num] = _build_parser(reg)
+            if shape is not None:
+                shared[shape] = dispatch[reg_num], reg['_size']
+        return registers, dispatch
 
 def decode_value_frame(value_frame):
     """Decode a base64 value frame string and analyze its structure."""
     try:
         # Decode base64 string
-        decoded = base64.b64decode(value_frame)
+        decoded = b64decode(value_frame)
         print(f"\nDecoded value frame length: {len(decoded)} bytes (0x{len(decoded):x})")
         
         # Print first 32 bytes in hex format
         print("\nFirst 32 bytes:")
         for i in range(0, min(32, len(decoded)), 16):
-            hex_bytes = ' '.join(f'{b:02x}' for b in decoded[i:i+16])
-            print(f"Offset {i:3d}: {hex_bytes}")
+            print(f"Offset {i:3d}: {decoded[i:i+16].hex(' ')}")
             
         # Analyze header structure
         print("\nHeader Analysis:")
@@ -53,12 +106,7 @@ def decode_value_frame(value_frame):
             print(f"Data length: 0x{data_len.hex()} ({int.from_bytes(data_len, 'little')} bytes)")
             
         # Look for ASCII text in first 20 bytes
-        ascii_text = ''
-        for b in decoded[:20]:
-            if 32 <= b <= 126:  # Printable ASCII range
-                ascii_text += chr(b)
-            else:
-                ascii_text += '.'
+        ascii_text = decoded[:20].translate(_ASCII_MAP).decode('ascii')
         print(f"\nASCII text in first 20 bytes: {ascii_text}")
         
         # Extract device function from offset 18
@@ -85,62 +133,111 @@ def decode_value_frame(value_frame):
         print(f"Error decoding value frame: {e}")
         return b''
 
-def parse_register_value(data: bytes, reg_def: Dict[str, Any], offset: int) -> Any:
-    """Parse a register value according to its definition."""
+def _int_keys(value_map: Dict[Any, Any]) -> Dict[int, Any]:
+    """Re-key a JSON value map by int so lookups don't need str(value)."""
+    return {int(k): v for k, v in value_map.items()}
+
+def _build_parser(reg_def: Dict[str, Any]) -> Callable[[bytes, int], Any]:
+    """Build a parser for a register definition.
+
+    The returned function takes (data, offset) and returns the decoded value.
+    The number of bytes the register occupies in the frame is stored on the
+    definition as '_size'.
+    """
     if 'num_values' in reg_def:
         # Handle multi-value registers
-        values = {}
-        for value_map in reg_def['value_map']:
+        reg_def['_size'] = 2  # Multi-value registers use 2 bytes
+        fields = reg_def['value_map']
+        for value_map in fields:
             if value_map['value_unit'] == 'bit':
-                # Extract bits from the value
-                mask = (1 << value_map['value_size']) - 1
-                value = (int.from_bytes(data[offset:offset+2], 'little') >> value_map['value_location']) & mask
-                if 'value_map' in value_map:
-                    value = value_map['value_map'].get(str(value), value)
-                values[value_map['shortname']] = value
-            elif value_map['value_unit'] == 'byte':
-                # Extract bytes from the value
-                value = data[offset + value_map['value_location']]
-                if 'value_map' in value_map:
-                    value = value_map['value_map'].get(str(value), value)
-                values[value_map['shortname']] = value
-        return values
-    else:
-        # Handle single-value registers
-        datatype = reg_def.get('datatype', 'uint16')
-        if datatype == 'uint16':
-            value = struct.unpack('<H', data[offset:offset+2])[0]
-        elif datatype == 'float':
-            value = struct.unpack('<f', data[offset:offset+4])[0]
-        elif datatype == 'uint8':
-            value = data[offset]
-        else:
-            value = struct.unpack('<H', data[offset:offset+2])[0]
+                value_map['_mask'] = (1 << value_map['value_size']) - 1
+            if 'value_map' in value_map:
+                value_map['value_map'] = _int_keys(value_map['value_map'])
+
+        def parse_multi(data: bytes, offset: int) -> Dict[str, Any]:
+            values = {}
+            # Read the little-endian word once for all bit fields
+            word = data[offset] | (data[offset+1] << 8)
+            for value_map in fields:
+                if value_map['value_unit'] == 'bit':
+                    # Extract bits from the value
+                    value = (word >> value_map['value_location']) & value_map['_mask']
+                    if 'value_map' in value_map:
+                        value = value_map['value_map'].get(value, value)
+                    values[value_map['shortname']] = value
+                elif value_map['value_unit'] == 'byte':
+                    # Extract bytes from the value
+                    value = data[offset + value_map['value_location']]
+                    if 'value_map' in value_map:
+                        value = value_map['value_map'].get(value, value)
+                    values[value_map['shortname']] = value
+            return values
+
+        return parse_multi
+
+    # Handle single-value registers
+    unpack, reg_def['_size'] = _DATATYPES.get(reg_def.get('datatype'), _DATATYPES['uint16'])
+    scale = reg_def.get('unit_scale')
+    value_map = reg_def.get('value_map')
+    if value_map is not None:
+        value_map = _int_keys(value_map)
+
+    def parse_single(data: bytes, offset: int) -> Any:
+        value = unpack(data, offset)[0]
 
         # Apply unit scale if specified
-        if 'unit_scale' in reg_def:
-            value *= float(reg_def['unit_scale'])
+        if scale is not None:
+            value *= scale
 
         # Apply value mapping if specified
-        if 'value_map' in reg_def:
-            value = reg_def['value_map'].get(str(value), value)
+        if value_map is not None:
+            value = value_map.get(value, value)
 
         return value
 
-def process_portal_file(filename: str, registers: Dict[int, Any]):
-    """Process a single portal file and print its register values."""
+    return parse_single
+
+def _portal_field(buf, key: bytes) -> Optional[bytes]:
+    """Return the second tab-separated column of the last "key<TAB>value" line in a portal dump."""
+    prefix = b'\n' + key + b'\t'
+    start = buf.rfind(prefix)
+    if start != -1:
+        start += len(prefix)
+    elif buf[:len(prefix) - 1] == prefix[1:]:
+        start = len(prefix) - 1
+    else:
+        return None
+    # The value column ends at the next tab or the end of the line
+    end = buf.find(b'\n', start)
+    if end == -1:
+        end = len(buf)
+    tab = buf.find(b'\t', start, end)
+    return buf[start:tab if tab != -1 else end]
+
+def process_portal_file(filename: str, registers: Dict[int, Any], dispatch: List[Optional[Callable]], verbose: bool = False):
+    """Process a single portal file and print its register values.
+
+    Registers without a definition are only dumped when verbose is set.
+    """
     print(f"\nProcessing file: {filename}")
     print("=" * 50)
     
     # Read valueFrame and startRegister from portal file
-    with open(filename, 'r') as f:
+    with open(filename, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # mmap refuses empty files
+            buf = None
         value_frame = None
         start_register = 0
-        for line in f:
-            if line.startswith('valueFrame'):
-                value_frame = line.split('\t')[1].strip().strip('"')
-            elif line.startswith('startRegister'):
-                start_register = int(line.split('\t')[1].strip())
+        if buf is not None:
+            with buf:
+                field = _portal_field(buf, b'valueFrame')
+                if field is not None:
+                    value_frame = field.strip().strip(b'"').decode('ascii')
+                field = _portal_field(buf, b'startRegister')
+                if field is not None:
+                    start_register = int(field)
         
         if not value_frame:
             print(f"Error: No valueFrame found in {filename}")
@@ -148,79 +245,117 @@ def process_portal_file(filename: str, registers: Dict[int, Any]):
         print(f"Starting at register {start_register}")
 
     # Decode valueFrame
-    data_hex = decode_value_frame(value_frame)
+    data = decode_value_frame(value_frame)
     
     # Skip header (looks like 4 bytes of header + serial number)
-    offset = 0
-    while offset < len(data_hex) and data_hex[offset] != '00':
-        offset += 1
-    offset += 1  # Skip the null terminator
+    try:
+        offset = data.index(0) + 1  # Skip the null terminator
+    except ValueError:
+        offset = len(data)
     
     # Parse and display register values
     print("\nRegister Values:")
     print("-" * 50)
     
+    # Collect output lines and write them in one go rather than per print()
+    out = []
     register_number = start_register  # Start at the specified register number
-    while offset < len(data_hex):
+    data_len = len(data)
+    defined = len(dispatch)
+    # Parsers and unpackers read through a view, so nothing in the loop copies the frame
+    view = memoryview(data)
+    # Bind globals and bound methods used per register as locals
+    emit = out.append
+    registers_get = registers.get
+    u16le = _U16LE
+    _isinstance = isinstance
+    # Load the body as little-endian words in one pass; plain uint16 registers and
+    # the unknown register dump index into it instead of unpacking each value
+    body_start = offset
+    words = array.array('H')
+    words.frombytes(view[offset:offset + ((data_len - offset) & ~1)])
+    if sys.byteorder == 'big':
+        words.byteswap()
+    n_words = len(words)
+    while offset < data_len:
         try:
-            if register_number in registers:
-                reg_def = registers[register_number]
-                value = parse_register_value(bytes.fromhex(data_hex[offset:]), reg_def, 0)
+            parser = dispatch[register_number] if register_number < defined else None
+            if parser is not None:
+                reg_def = registers_get(register_number)
+                index = (offset - body_start) >> 1
+                if reg_def['_plain_u16'] and index < n_words:
+                    value = words[index]
+                    scale = reg_def['unit_scale']
+                    if scale is not None:
+                        value *= scale
+                else:
+                    value = parser(view, offset)
                 
                 # Format the output
-                if isinstance(value, dict):
-                    print(f"Register {register_number} ({reg_def['register_type']}) ({reg_def.get('description', 'Unknown')}):")
+                if _isinstance(value, dict):
+                    emit(reg_def['_line_prefix'] + ":")
                     if 'num_values' in reg_def and reg_def.get('display_as') == 'flags':
                         # For flag registers, show each bit's meaning
-                        raw_value = struct.unpack('<H', bytes.fromhex(data_hex[offset:offset+4])[0:2])[0]
-                        print(f"  Raw value: {raw_value} (0x{raw_value:04X}, 0b{raw_value:016b})")
-                        print("  Flags:")
+                        raw_value = u16le(view, offset)[0]
+                        emit(f"  Raw value: {raw_value} (0x{raw_value:04X}, 0b{raw_value:016b})")
+                        emit("  Flags:")
                         for flag_name, flag_value in value.items():
-                            print(f"    {flag_name}: {flag_value}")
+                            emit(f"    {flag_name}: {flag_value}")
                     else:
                         for k, v in value.items():
-                            print(f"  {k}: {v}")
+                            emit(f"  {k}: {v}")
                 else:
-                    unit = reg_def.get('unit', '')
-                    print(f"Register {register_number} ({reg_def['register_type']}) ({reg_def.get('description', 'Unknown')}): {value} {unit}")
+                    emit(f"{reg_def['_line_prefix']}: {value}{reg_def['_line_suffix']}")
                 
-                # Update offset based on register type
-                if 'num_values' in reg_def:
-                    offset += 2  # Multi-value registers use 2 bytes
-                elif reg_def.get('datatype') == 'float':
-                    offset += 4  # Float values use 4 bytes
-                else:
-                    offset += 2  # Default to 2 bytes for other types
+                offset += reg_def['_size']
             else:
-                # Print unknown registers with both big-endian and little-endian interpretations
-                value_le = struct.unpack('<H', bytes.fromhex(data_hex[offset:offset+4])[0:2])[0]  # little-endian
-                value_be = struct.unpack('>H', bytes.fromhex(data_hex[offset:offset+4])[0:2])[0]  # big-endian
-                print(f"Register unknown-{register_number} ({reg_def['register_type']}):")
-                print(f"  LE: {value_le} (0x{value_le:04X}, 0b{value_le:016b})")
-                print(f"  BE: {value_be} (0x{value_be:04X}, 0b{value_be:016b})")
-                print(f"  Bytes at offset {offset}:")
-                print(f"    Byte 0: {bytes.fromhex(data_hex[offset:offset+2])[0]} (0x{bytes.fromhex(data_hex[offset:offset+2])[0]:02X}, 0b{bytes.fromhex(data_hex[offset:offset+2])[0]:08b})")
-                print(f"    Byte 1: {bytes.fromhex(data_hex[offset+2:offset+4])[0]} (0x{bytes.fromhex(data_hex[offset+2:offset+4])[0]:02X}, 0b{bytes.fromhex(data_hex[offset+2:offset+4])[0]:08b})")
+                if verbose:
+                    # Print unknown registers with both big-endian and little-endian interpretations
+                    value_le = words[(offset - body_start) >> 1]  # little-endian
+                    byte0, byte1 = value_le & 0xFF, value_le >> 8
+                    value_be = (byte0 << 8) | byte1  # big-endian
+                    emit(f"Register unknown-{register_number}:\n"
+                         f"  LE: {value_le} (0x{value_le:04X}, 0b{value_le:016b})\n"
+                         f"  BE: {value_be} (0x{value_be:04X}, 0b{value_be:016b})\n"
+                         f"  Bytes at offset {offset}: {byte0:02X} {byte1:02X}")
                 offset += 2  # Unknown registers use 2 bytes
             
             register_number += 1
             
         except Exception as e:
-            print(f"Error at offset {offset}: {e}")
+            emit(f"Error at offset {offset}: {e}")
             break
 
+    if out:
+        sys.stdout.write('\n'.join(out) + '\n')
+
+@lru_cache(maxsize=128)
+def render_portal_file(filename: str, mtime_ns: int, size: int, verbose: bool = False) -> str:
+    """Return the output of process_portal_file for a file as a string.
+
+    Results are cached on (filename, mtime_ns, size), so a file that has not
+    changed since it was last rendered is not decoded again.
+    """
+    registers, dispatch = load_register_definitions()
+    out = io.StringIO()
+    with redirect_stdout(out):
+        process_portal_file(filename, registers, dispatch, verbose)
+    return out.getvalue()
+
 def main():
     # Set up command line argument parsing
     parser = argparse.ArgumentParser(description='Parse EG4 portal files and display register values')
     parser.add_argument('files', nargs='+', help='One or more portal files to process')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Also dump registers without a definition')
     args = parser.parse_args()
 
     # Load register definitions
-    registers = load_register_definitions()
+    load_register_definitions()
 
     # Process each file
     for filename in args.files:
-        process_portal_file(filename, registers)
+        st = os.stat(filename)
+        sys.stdout.write(render_portal_file(filename, st.st_mtime_ns, st.st_size, args.verbose))
 
 if __name__ == '__main__':
     main() 
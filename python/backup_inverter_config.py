@@ -12,6 +12,16 @@ import socket
 import struct
 import select
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,23 +29,79 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Packet header: magic, protocol, frame length, unknown, TCP function, datalog ID.
+# Requests follow it with a data section and a 2-byte CRC.
+_PKT_HDR = struct.Struct('<2sHHBB10s')
+# Read request data section: source, function code, serial, register, count
+_PKT_DATA = struct.Struct('<BB10sHH')
+# Heartbeat: the header followed by a single zero byte, with no CRC
+_HEARTBEAT = struct.Struct('<2sHHBB10sB')
+_HEADER_LEN = _PKT_HDR.size
+_READ_DATA_LEN = _PKT_DATA.size
+
+def _crc16_modbus_table():
+    """Build the lookup table for the reflected Modbus CRC16 (polynomial 0xA001)."""
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc = crc >> 1
+        yield crc
+
+_CRC16_MODBUS_TABLE = tuple(_crc16_modbus_table())
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialise obj as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+try:
+    # Native implementation, if installed
+    from libscrc import modbus as _crc16_modbus
+except ImportError:
+    def _crc16_modbus(data):
+        """Calculate the Modbus CRC16 of data as an int."""
+        crc = 0xFFFF
+        for b in data:
+            crc = (crc >> 8) ^ _CRC16_MODBUS_TABLE[(crc ^ b) & 0xFF]
+        return crc
+
 class CustomModbusClient:
     """Custom Modbus client that handles EG4 protocol specifics."""
-    def __init__(self, host, port=8000, connect_timeout=5.0, read_timeout=30.0, delay_ms=200):
+    def __init__(self, host, port=8000, connect_timeout=5.0, read_timeout=30.0, delay_ms=200, inter_read_delay_ms=0):
         self.host = host
         self.port = port
         self.connect_timeout = connect_timeout
         self.read_timeout = read_timeout
-        self.delay_ms = delay_ms
+        self.delay_ms = delay_ms  # Delay before retrying a failed read
+        self.inter_read_delay_ms = inter_read_delay_ms  # Delay after each successful read
         self.sock = None
+        self._poll = None
         self.datalog_id = bytearray(10)  # Initialize with zeros
         self.inverter_serial = bytearray(10)  # Initialize with zeros
+        # Decoded copies of the IDs above for logging, refreshed when they change
+        self._datalog_id_str = ''
+        self._inverter_serial_str = ''
+        # (datalog ID, packet) for the last heartbeat built
+        self._hb_cache = (None, None)
         self.last_heartbeat = 0
         self.logger = logging.getLogger(__name__)
         self.max_buffer_size = 1024
         self.reconnect_delay = 5.0  # 5 seconds reconnect delay
         self.tcp_keepalive = 60  # 60 seconds TCP keepalive
         self.max_buffer_size = 65536  # 64KB max buffer size (matching Rust)
+        # Receive buffer reused by every read_response call
+        self._rxbuf = bytearray(self.max_buffer_size)
+        self._rxview = memoryview(self._rxbuf)
 
     def connect(self):
         """Connect to the inverter with proper socket options."""
@@ -43,6 +109,11 @@ class CustomModbusClient:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.settimeout(self.connect_timeout)  # Set timeout for connection
             self.sock.connect((self.host, self.port))
+            self.sock.settimeout(self.read_timeout)
+            
+            # Wait for responses with poll rather than blocking in recv
+            self._poll = select.poll()
+            self._poll.register(self.sock, select.POLLIN)
             
             # Set TCP_NODELAY for lower latency
             self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
@@ -54,103 +125,103 @@ class CustomModbusClient:
             self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
             
             self.logger.info(f"Connection successful on port {self.port}")
-            self.last_heartbeat = time.time()
+            self.last_heartbeat = time.monotonic()
             return True
         except Exception as e:
             self.logger.error(f"Failed to connect: {e}")
             self.sock = None
+            self._poll = None
             return False
 
     def calculate_crc16(self, data):
         """Calculate CRC16 for the given data."""
-        crc = 0xFFFF
-        for b in data:
-            crc ^= b
-            for _ in range(8):
-                if crc & 0x0001:
-                    crc = (crc >> 1) ^ 0xA001
-                else:
-                    crc = crc >> 1
         # Return CRC in little-endian byte order
-        return bytes([crc & 0xFF, (crc >> 8) & 0xFF])
+        return _crc16_modbus(data).to_bytes(2, byteorder='little')
 
     def build_packet(self, register_address, count):
         """Build a packet to read registers."""
+        # Header, data section and CRC are written into one buffer of the final size
+        packet = bytearray(_HEADER_LEN + _READ_DATA_LEN + 2)
+        data_len = _READ_DATA_LEN
+        # Skip building hex dumps for every packet unless debug logging is on
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+
         # Build data section
-        data = bytearray()
-        data.append(0x00)  # Source (0=client)
-        data.append(0x03)  # Function code (3=read holding registers)
         # CRITICAL_SECTION_DO_NOT_MODIFY_OR_REMOVE: Must use most recently received inverter serial
         # SYSTEM_CRITICAL: Connection maintenance
-        data.extend(self.inverter_serial)  # Inverter serial (10 bytes)
-        self.logger.info(f"Transmitting with inverter serial: {self.inverter_serial}")
+        _PKT_DATA.pack_into(
+            packet, _HEADER_LEN,
+            0x00,  # Source (0=client)
+            0x03,  # Function code (3=read holding registers)
+            bytes(self.inverter_serial),  # Inverter serial (10 bytes)
+            register_address & 0xFFFF,  # Register address
+            count & 0xFFFF,  # Register count
+        )
+        self.logger.debug("Transmitting with inverter serial: %s", self.inverter_serial)
         # END_CRITICAL_SECTION_SERIAL
         
-        # Convert register address and count to bytes, ensuring they're in valid range
-        data.extend((register_address & 0xFFFF).to_bytes(2, byteorder='little'))  # Register address
-        data.extend((count & 0xFFFF).to_bytes(2, byteorder='little'))  # Register count
-        
-        # Calculate data section length
-        data_len = len(data)
-        self.logger.debug(f"Data section length: {data_len}")
-        self.logger.debug(f"Data section: {data.hex()}")
+        if debug:
+            self.logger.debug("Data section length: %d", data_len)
+            self.logger.debug("Data section: %s", packet[_HEADER_LEN:_HEADER_LEN + data_len].hex())
         
         # Build header
-        header = bytearray()
-        header.extend(b'\xa1\x1a')  # Magic bytes
-        header.extend((0x01).to_bytes(2, byteorder='little'))  # Protocol version (1 for read)
-        header.extend((data_len + 12).to_bytes(2, byteorder='little'))  # Frame length (data_len + 12 for header)
-        header.append(0x01)  # Unknown, always 1
-        header.append(0xc2)  # TCP function (0xc2=read holding registers)
         # CRITICAL_SECTION_DO_NOT_MODIFY_OR_REMOVE: Must use most recently received datalog ID
         # SYSTEM_CRITICAL: Connection maintenance
-        header.extend(self.datalog_id)  # Datalog ID
-        self.logger.info(f"Transmitting with datalog ID: {self.datalog_id}")
+        _PKT_HDR.pack_into(
+            packet, 0,
+            b'\xa1\x1a',  # Magic bytes
+            0x01,  # Protocol version (1 for read)
+            data_len + 12,  # Frame length (data_len + 12 for header)
+            0x01,  # Unknown, always 1
+            0xc2,  # TCP function (0xc2=read holding registers)
+            bytes(self.datalog_id),  # Datalog ID
+        )
+        self.logger.debug("Transmitting with datalog ID: %s", self.datalog_id)
         # END_CRITICAL_SECTION_DATALOG
         
-        self.logger.debug(f"Header length: {len(header)}")
-        self.logger.debug(f"Header: {header.hex()}")
+        if debug:
+            self.logger.debug("Header length: %d", _HEADER_LEN)
+            self.logger.debug("Header: %s", packet[:_HEADER_LEN].hex())
         
         # CRITICAL_SECTION_DO_NOT_MODIFY_OR_REMOVE: CRC calculation and verification
         # SYSTEM_CRITICAL: Protocol compliance
-        crc = self.calculate_crc16(header + data)
-        self.logger.debug(f"Calculated CRC: {crc.hex()}")
+        crc = self.calculate_crc16(memoryview(packet)[:-2])
         
         # Combine all parts
-        packet = header + data + crc
-        self.logger.debug(f"Total packet length: {len(packet)}")
-        self.logger.debug(f"Complete packet: {packet.hex()}")
-        
-        # Verify the CRC we just calculated
-        if crc == packet[-2:]:
-            self.logger.info("Outgoing packet CRC check passed ✓")
-        else:
-            self.logger.warning(f"Outgoing packet CRC mismatch! Calculated: {crc.hex()}, Packet: {packet[-2:].hex()}")
+        packet[-2:] = crc
+        if debug:
+            self.logger.debug("Calculated CRC: %s", crc.hex())
+            self.logger.debug("Total packet length: %d", len(packet))
+            self.logger.debug("Complete packet: %s", packet.hex())
         # END_CRITICAL_SECTION_CRC
         
         return packet
 
     def build_heartbeat_packet(self):
         """Build a heartbeat packet."""
-        # Build header
-        header = bytearray()
-        header.extend(b'\xa1\x1a')  # Magic bytes
-        header.extend((2).to_bytes(2, byteorder='little'))  # Protocol version 2
-        header.extend((18).to_bytes(2, byteorder='little'))  # Frame length (header only)
-        header.extend([1])  # Unknown
-        header.extend([193])  # TCP function (Heartbeat)
         # CRITICAL_SECTION_DO_NOT_MODIFY_OR_REMOVE: Must use most recently received datalog ID
         # SYSTEM_CRITICAL: Connection maintenance
-        header.extend(self.datalog_id)  # Datalog ID
-        self.logger.info(f"Heartbeat - Transmitting with datalog ID: {self.datalog_id.decode()}")
+        datalog_id = bytes(self.datalog_id)
+        cached_id, cached_packet = self._hb_cache
+        if cached_id == datalog_id:
+            return cached_packet
+        packet = _HEARTBEAT.pack(
+            b'\xa1\x1a',  # Magic bytes
+            2,  # Protocol version 2
+            18,  # Frame length (header only)
+            1,  # Unknown
+            193,  # TCP function (Heartbeat)
+            datalog_id,  # Datalog ID
+            0,  # Heartbeat has no data section, just a zero byte
+        )
+        self._hb_cache = (datalog_id, packet)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Heartbeat - Transmitting with datalog ID: %s", self._datalog_id_str)
         # END_CRITICAL_SECTION_DATALOG
         
-        # Heartbeat has no data section, just a zero byte
-        data = bytearray([0])
-        
         # No CRC for heartbeat packets
-        packet = header + data
-        self.logger.debug(f"Built heartbeat packet: {packet.hex()}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Built heartbeat packet: %s", packet.hex())
         return packet
 
     def send_heartbeat(self):
@@ -158,7 +229,7 @@ class CustomModbusClient:
         try:
             packet = self.build_heartbeat_packet()
             self.sock.sendall(packet)
-            self.last_heartbeat = time.time()
+            self.last_heartbeat = time.monotonic()
             self.logger.debug("Sent heartbeat packet")
             return True
         except Exception as e:
@@ -167,54 +238,66 @@ class CustomModbusClient:
 
     def check_and_send_heartbeat(self):
         """Check if it's time to send a heartbeat and send if needed."""
-        # Send heartbeat every 30 seconds
-        if time.time() - self.last_heartbeat >= 30:
+        # Send heartbeat every 30 seconds (monotonic, so clock changes don't matter)
+        if time.monotonic() - self.last_heartbeat >= 30:
             return self.send_heartbeat()
         return True
 
     def read_response(self):
         """Read and parse the response from the inverter."""
         try:
-            # Set a timeout for the read operation
-            self.sock.settimeout(30)  # 30 second timeout
-            
-            # Read all available data in chunks until we have the complete response
-            data = bytearray()
-            while True:
-                chunk = self.sock.recv(1024)
-                if not chunk:
+            # Read all available data into the receive buffer until we have the complete response
+            rxbuf = self._rxbuf
+            rxview = self._rxview
+            pos = 0
+            expected = None  # Total frame size, known once the length field arrives
+            while expected is None or pos < expected:
+                if pos == len(rxbuf):
+                    raise Exception(f"Response exceeds {len(rxbuf)} byte buffer")
+                if not self._poll.poll(self.read_timeout * 1000):
+                    raise socket.timeout("timed out")
+                # Never read past the current frame, so a frame queued right
+                # behind it (e.g. data after a heartbeat) stays in the socket
+                want = expected if expected is not None else 6
+                n = self.sock.recv_into(rxview[pos:want])
+                if not n:
                     break
-                data.extend(chunk)
+                pos += n
                 
-                # Check if we have a complete packet
-                if len(data) >= 19:  # Minimum header length
-                    # Check for heartbeat response
-                    if data[0:4] == b'\xa1\x1a\x02\x00':
-                        self.logger.debug("Received heartbeat response")
-                        return None
-                        
-                    # Check if we have the complete packet
-                    if len(data) >= 21:  # Header + data + CRC
-                        break
-                        
-            if not data:
+                # The frame length at bytes 4-5 counts everything after byte 5
+                if expected is None and pos >= 6:
+                    expected = int.from_bytes(rxbuf[4:6], 'little') + 6
+                    
+            if not pos:
                 raise Exception("No data received")
                 
-            if len(data) < 21:  # Minimum packet size
-                raise Exception(f"Response too short: {len(data)} bytes")
+            if expected is None or pos < expected:
+                raise Exception(f"Connection closed mid-frame after {pos} bytes")
+                
+            # Check for heartbeat response (the whole frame has been consumed)
+            if rxbuf[0:4] == b'\xa1\x1a\x02\x00':
+                self.logger.debug("Received heartbeat response")
+                return None
+                
+            if expected < 21:  # Minimum packet size
+                raise Exception(f"Response too short: {expected} bytes")
                 
-            # Split into header, data section, and CRC
-            header = data[:19]
-            data_section = data[19:-2]
-            received_crc = data[-2:]
+            # Split into header, data section, and CRC as views into the receive
+            # buffer; anything kept past the next read is copied out below
+            header = rxview[:19]
+            data_section = rxview[19:expected - 2]
+            received_crc = rxview[expected - 2:expected]
             
-            self.logger.debug(f"Received header: {header.hex()} - {header[8:18]}")
-            self.logger.debug(f"Received data: {data_section.hex()} - {data_section[3:13]}")
-            self.logger.debug(f"Received CRC: {received_crc.hex()}")
+            debug = self.logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                self.logger.debug("Received header: %s - %s", header.hex(), bytes(header[8:18]))
+                self.logger.debug("Received data: %s - %s", data_section.hex(), bytes(data_section[3:13]))
+                self.logger.debug("Received CRC: %s", received_crc.hex())
             
             # Calculate CRC over data section only (excluding header)
             calculated_crc = self.calculate_crc16(data_section)
-            self.logger.debug(f"Calculated CRC: {calculated_crc.hex()}")
+            if debug:
+                self.logger.debug("Calculated CRC: %s", calculated_crc.hex())
             
             # Compare CRCs properly (both are bytes objects)
             if received_crc != calculated_crc:
@@ -228,17 +311,25 @@ class CustomModbusClient:
                 datalog_id = header[8:18] # CURSOR DO NOT TOUCH
                 # Extract and preserve inverter serial from data section (bytes 2-11)
                 inverter_serial = data_section[3:13] # CURSOR DO NOT TOUCH
+                # Only decode IDs that differ from the cached ones
+                if datalog_id == self.datalog_id:
+                    datalog_id_str = self._datalog_id_str
+                else:
+                    datalog_id_str = bytes(datalog_id).decode('ascii', 'replace')
                 # Always log both old and new values
-                self.logger.info(f"Previous datalog ID: {self.datalog_id.decode()}")
-                self.logger.info(f"Received datalog ID: {datalog_id.decode()}")
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info("Previous datalog ID: %s", self._datalog_id_str)
+                    self.logger.info("Received datalog ID: %s", datalog_id_str)
                 # Always update the value
-                self.datalog_id = datalog_id
+                self.datalog_id = bytearray(datalog_id)
+                self._datalog_id_str = datalog_id_str
                 if self.inverter_serial != inverter_serial:
-                    self.logger.info(f"read_response:Previous serial ID (ascii): {self.inverter_serial.decode()} to {inverter_serial.decode()}")
-                # Log both old and new values with hex representation
+                    inverter_serial_str = bytes(inverter_serial).decode('ascii', 'replace')
+                    self.logger.info("read_response:Previous serial ID (ascii): %s to %s",
+                                     self._inverter_serial_str, inverter_serial_str)
+                    self._inverter_serial_str = inverter_serial_str
                 # IMMUTABLE CODE FOR CURSOR DO NOT TOUCH
-                self.datalog_id = datalog_id  # Create a new bytearray to ensure we have a copy
-                self.inverter_serial = inverter_serial
+                self.inverter_serial = bytearray(inverter_serial)
                 
                 # Update config data with received IDs if it exists
                 if 'config_data' in locals():
@@ -249,7 +340,7 @@ class CustomModbusClient:
                 raise
             # END_CRITICAL_SECTION_DO_NOT_MODIFY_OR_REMOVE
             
-            return data_section
+            return bytes(data_section)  # Copy out of the shared receive buffer
             
         except Exception as e:
             self.logger.error(f"Error reading response: {str(e)}")
@@ -266,31 +357,29 @@ class CustomModbusClient:
                 packet = self.build_packet(start_reg, count)
                 self.sock.sendall(packet)
                 
-                # Read the response
+                # Read the response, skipping heartbeats queued ahead of it
                 response = self.read_response()
-                if response is None:  # Heartbeat response
-                    continue
+                while response is None:  # Heartbeat response
+                    response = self.read_response()
                     
                 # Process the response
                 if len(response) < 2:  # Need at least 2 bytes for a register value
                     raise Exception(f"Response too short: {len(response)} bytes")
                     
                 # Extract register values - each register is 2 bytes in little-endian order
-                values = []
                 try:
                     # Each register is 2 bytes in little-endian order
-                    num_registers = len(response) // 2
-                    for i in range(num_registers):
-                        if i * 2 + 1 < len(response):
-                            value = int.from_bytes(response[i*2:i*2+2], byteorder='little')
-                            self.logger.debug(f"Register {start_reg + i}: {value} (0x{value:04x})")
-                            values.append(value)
+                    values = list(struct.unpack_from(f'<{len(response) // 2}H', response))
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        for reg_num, value in enumerate(values, start_reg):
+                            self.logger.debug("Register %d: %d (0x%04x)", reg_num, value, value)
                 except Exception as e:
                     self.logger.error(f"Error extracting register values: {str(e)}")
                     raise
                     
-                # Add delay between reads
-                time.sleep(self.delay_ms / 1000)  # Convert ms to seconds
+                # Add delay between reads, if configured
+                if self.inter_read_delay_ms:
+                    time.sleep(self.inter_read_delay_ms / 1000)  # Convert ms to seconds
                 
                 return values
                 
@@ -316,21 +405,31 @@ class CustomModbusClient:
             except:
                 pass
             self.sock = None
+            self._poll = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def try_connect_and_read(self, register_address, count):
-        """Try to connect and read registers."""
-        if not self.connect():
+        """Connect if not already connected, then read registers.
+
+        The connection is left open for further reads; use close() or the
+        client as a context manager to release it.
+        """
+        if self.sock is None and not self.connect():
             return None
-        try:
-            return self.read_holding_registers(register_address, count)
-        finally:
-            self.close()
+        return self.read_holding_registers(register_address, count)
+
+def test_connection(client: CustomModbusClient) -> bool:
+    """Test if we can read registers from the inverter using the EG4 protocol.
 
-def test_connection(host: str, port: int) -> bool:
-    """Test if we can connect to the host:port and read registers using the EG4 protocol."""
+    Connects the client if needed and leaves the connection open for reuse.
+    """
     try:
-        client = CustomModbusClient(host, port, timeout=10)
-        if not client.connect():
+        if client.sock is None and not client.connect():
             return False
             
         # Try to read register 0
@@ -346,14 +445,12 @@ def test_connection(host: str, port: int) -> bool:
     except Exception as e:
         logger.error(f"Connection test failed: {e}")
         return False
-    finally:
-        client.close()
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """Load configuration from YAML file."""
     try:
         with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=SafeLoader)
     except Exception as e:
         logger.error(f"Error loading config file {config_path}: {e}")
         sys.exit(1)
@@ -361,8 +458,8 @@ def load_config(config_path: str) -> Dict[str, Any]:
 def load_registers(register_path: str) -> Dict[str, Any]:
     """Load register definitions from JSON file."""
     try:
-        with open(register_path, 'r') as f:
-            return json.load(f)
+        with open(register_path, 'rb') as f:
+            return _json_loads(f.read())
     except Exception as e:
         logger.error(f"Error loading register file {register_path}: {e}")
         sys.exit(1)
@@ -387,14 +484,14 @@ def decode_register_value(register_def: Dict[str, Any], value: int) -> Any:
         # Default to integer value
         return value
 
-def get_register_definition(registers: Dict[str, Any], register_type: str, register_number: int) -> Dict[str, Any]:
-    """Get register definition from register map."""
+def build_register_index(registers: Dict[str, Any]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """Index register definitions by (register_type, register_number)."""
+    reg_index = {}
     for reg_map in registers['registers']:
-        if reg_map['register_type'] == register_type:
-            for reg in reg_map['register_map']:
-                if reg['register_number'] == register_number:
-                    return reg
-    return None
+        for reg in reg_map['register_map']:
+            # The first definition of a register wins, as with a linear scan
+            reg_index.setdefault((reg_map['register_type'], reg['register_number']), reg)
+    return reg_index
 
 def create_modbus_client(host: str, port: int) -> pymodbus.client.ModbusTcpClient:
     """Create a Modbus TCP client with appropriate settings."""
@@ -419,7 +516,7 @@ def create_modbus_client(host: str, port: int) -> pymodbus.client.ModbusTcpClien
     logger.debug(f"  TCP_KEEPALIVE_INTERVAL: 60s")
     return client
 
-def read_inverter_config(client: CustomModbusClient, registers: Dict[str, Any]) -> Dict[str, Any]:
+def read_inverter_config(client: CustomModbusClient, reg_index: Dict[Tuple[str, int], Dict[str, Any]]) -> Dict[str, Any]:
     """Read and decode all hold registers from inverter."""
     config = {}
     
@@ -430,17 +527,11 @@ def read_inverter_config(client: CustomModbusClient, registers: Dict[str, Any])
         if not response:
             raise Exception("No response received for initial register read")
         
-        logger.info(f"Received {len(response)} bytes of register data")
+        logger.info(f"Received {len(response)} register values")
         
         # Process each register in the response
-        for i in range(0, len(response), 2):
-            reg_num = i // 2
-            if reg_num >= 21:  # Don't process beyond register 20
-                break
-                
-            # Read 2 bytes as little-endian value
-            value = int.from_bytes(response[i:i+2], byteorder='little')
-            reg_def = get_register_definition(registers, 'hold', reg_num)
+        for reg_num, value in enumerate(response[:21]):  # Don't process beyond register 20
+            reg_def = reg_index.get(('hold', reg_num))
             
             if reg_def:
                 decoded_value = decode_register_value(reg_def, value)
@@ -450,9 +541,9 @@ def read_inverter_config(client: CustomModbusClient, registers: Dict[str, Any])
                     'unit': reg_def.get('unit', ''),
                     'description': reg_def['description']
                 }
-                logger.info(f"Register {reg_num:2d}: {reg_def['shortname']:<30} = {value:5d} (0x{value:04x}) -> {decoded_value}")
+                logger.debug("Register %2d: %-30s = %5d (0x%04x) -> %s", reg_num, reg_def['shortname'], value, value, decoded_value)
             else:
-                logger.warning(f"Register {reg_num:2d}: Unknown register, raw value = {value:5d} (0x{value:04x})")
+                logger.warning("Register %2d: Unknown register, raw value = %5d (0x%04x)", reg_num, value, value)
             
     except Exception as e:
         logger.error(f"Error reading inverter config: {str(e)}")
@@ -461,12 +552,15 @@ def read_inverter_config(client: CustomModbusClient, registers: Dict[str, Any])
     logger.info(f"Successfully read {len(config)} registers")
     return config
 
-def try_connect_and_read(host: str, port: int, registers: Dict[str, Any]) -> Dict[str, Any]:
-    """Try to connect to the inverter and read configuration."""
-    client = None
+def try_connect_and_read(client: CustomModbusClient, reg_index: Dict[Tuple[str, int], Dict[str, Any]], block_size: int = 40) -> Dict[str, Any]:
+    """Read the inverter configuration over the client's connection.
+
+    Connects the client if needed; the caller owns the connection and closes
+    it. Registers after the initial batch are read block_size at a time.
+    """
+    host, port = client.host, client.port
     try:
-        client = CustomModbusClient(host, port)
-        if not client.connect():
+        if client.sock is None and not client.connect():
             logger.error(f"Failed to establish connection to {host}:{port}")
             return None
             
@@ -480,22 +574,16 @@ def try_connect_and_read(host: str, port: int, registers: Dict[str, Any]) -> Dic
             
         # If we got a different datalog/serial, log it
         if client.datalog_id:
-            logger.info(f"Using received datalog ID: {client.datalog_id.decode()}")
+            logger.info("Using received datalog ID: %s", client._datalog_id_str)
         if client.inverter_serial:
-            logger.info(f"Using received inverter serial: {client.inverter_serial.decode()}")
+            logger.info("Using received inverter serial: %s", client._inverter_serial_str)
             
         # Process register values from the response
         config_data = {}
         
         # Process first batch of registers (0-20)
-        for i in range(0, len(response), 2):
-            reg_num = i // 2
-            if reg_num >= 21:  # Don't process beyond register 20
-                break
-                
-            # Read 2 bytes as little-endian value
-            value = response[i] | (response[i+1] << 8)
-            reg_def = get_register_definition(registers, 'hold', reg_num)
+        for reg_num, value in enumerate(response[:21]):  # Don't process beyond register 20
+            reg_def = reg_index.get(('hold', reg_num))
             
             if reg_def:
                 decoded_value = decode_register_value(reg_def, value)
@@ -505,23 +593,20 @@ def try_connect_and_read(host: str, port: int, registers: Dict[str, Any]) -> Dic
                     'unit': reg_def.get('unit', ''),
                     'description': reg_def['description']
                 }
-                logger.info(f"Register {reg_num:5d}: {reg_def['shortname']:<30} = {value:5d} (0x{value:04x}) -> {decoded_value}")
+                logger.debug("Register %5d: %-30s = %5d (0x%04x) -> %s", reg_num, reg_def['shortname'], value, value, decoded_value)
             else:
-                logger.warning(f"Register {reg_num:5d}: Unknown register, raw value = {value:5d} (0x{value:04x})")
+                logger.warning("Register %5d: Unknown register, raw value = %5d (0x%04x)", reg_num, value, value)
         
-        # Send heartbeat after initial batch
-        client.send_heartbeat()
-        
-        # Read remaining registers in batches of 20
+        # Read remaining registers in batches of block_size
         max_retries = 3
         retry_delay = 1.0  # 1 second between retries
         consecutive_failures = 0
         max_consecutive_failures = 3  # Stop after 3 consecutive failures
         
-        # Start from register 20 and read in batches of 20
-        for start_reg in range(20, 65536, 20):  # Read up to register 65535 (or until we hit max failures)
-            end_reg = min(start_reg + 20, 65536)  # Ensure we don't exceed 65535
-            count = min(20, 65536 - start_reg)  # Adjust count for last batch
+        # Start from register 20 and read in batches of block_size
+        for start_reg in range(20, 65536, block_size):  # Read up to register 65535 (or until we hit max failures)
+            end_reg = min(start_reg + block_size, 65536)  # Ensure we don't exceed 65535
+            count = min(block_size, 65536 - start_reg)  # Adjust count for last batch
             
             logger.info(f"Reading registers {start_reg} to {end_reg-1}")
             
@@ -529,7 +614,7 @@ def try_connect_and_read(host: str, port: int, registers: Dict[str, Any]) -> Dic
             success = False
             for retry in range(max_retries):
                 try:
-                    # Send heartbeat before reading to keep connection alive
+                    # Send heartbeat before reading if one is due, to keep connection alive
                     client.check_and_send_heartbeat()
                     
                     response = client.read_holding_registers(start_reg, count)
@@ -537,12 +622,8 @@ def try_connect_and_read(host: str, port: int, registers: Dict[str, Any]) -> Dic
                         raise Exception("No response received")
                         
                     # Process this batch of registers
-                    for i in range(0, len(response), 2):
-                        reg_num = start_reg + (i // 2)
-                        
-                        # Read 2 bytes as little-endian value
-                        value = response[i] | (response[i+1] << 8)
-                        reg_def = get_register_definition(registers, 'hold', reg_num)
+                    for reg_num, value in enumerate(response, start_reg):
+                        reg_def = reg_index.get(('hold', reg_num))
                         
                         if reg_def:
                             decoded_value = decode_register_value(reg_def, value)
@@ -552,16 +633,13 @@ def try_connect_and_read(host: str, port: int, registers: Dict[str, Any]) -> Dic
                                 'unit': reg_def.get('unit', ''),
                                 'description': reg_def['description']
                             }
-                            logger.info(f"Register {reg_num:5d}: {reg_def['shortname']:<30} = {value:5d} (0x{value:04x}) -> {decoded_value}")
+                            logger.debug("Register %5d: %-30s = %5d (0x%04x) -> %s", reg_num, reg_def['shortname'], value, value, decoded_value)
                         else:
-                            logger.warning(f"Register {reg_num:5d}: Unknown register, raw value = {value:5d} (0x{value:04x})")
+                            logger.warning("Register %5d: Unknown register, raw value = %5d (0x%04x)", reg_num, value, value)
                     
                     # Successfully read this batch
                     success = True
                     consecutive_failures = 0  # Reset failure counter
-                    
-                    # Send heartbeat after successful batch read
-                    client.send_heartbeat()
                     break
                     
                 except Exception as e:
@@ -585,29 +663,22 @@ def try_connect_and_read(host: str, port: int, registers: Dict[str, Any]) -> Dic
                     logger.warning(f"Batch failed, will retry after delay")
                     time.sleep(retry_delay)
                     continue
-            
-            # Add a small delay between batches
-            time.sleep(0.2)
         
         if config_data:
             # Add received IDs to the configuration (convert bytearrays to hex strings)
-            config_data['_received_datalog'] = client.datalog_id
-            config_data['_received_serial'] = client.inverter_serial
+            config_data['_received_datalog'] = client.datalog_id.hex()
+            config_data['_received_serial'] = client.inverter_serial.hex()
             return config_data
             
     except Exception as e:
         logger.error(f"Error reading from port {port}: {e}")
         return None
-    finally:
-        if client:
-            client.close()
-            logger.info("Connection closed")
 
 def backup_inverter_config(config_path: str, register_path: str, output_file: str = None):
     """Main function to backup inverter configurations."""
     # Load configuration and register definitions
     config = load_config(config_path)
-    registers = load_registers(register_path)
+    reg_index = build_register_index(load_registers(register_path))
     
     # Process each inverter
     for inverter in config.get('inverters', []):
@@ -624,8 +695,14 @@ def backup_inverter_config(config_path: str, register_path: str, output_file: st
             
         logger.info(f"Processing inverter {serial} at {host}")
         
-        # Try configured port first
-        config_data = try_connect_and_read(host, configured_port, registers)
+        # The inverter accepts at most 40 registers per read
+        block_size = max(1, min(40, inverter.get('register_block_size', 40)))
+        
+        # Use one connection for the whole backup of this inverter
+        with CustomModbusClient(host, configured_port,
+                                inter_read_delay_ms=inverter.get('delay_ms', 0)) as client:
+            config_data = try_connect_and_read(client, reg_index, block_size)
+        logger.info("Connection closed")
         
         if not config_data:
             logger.error(f"Failed to read configuration from inverter {serial}")
@@ -640,17 +717,18 @@ def backup_inverter_config(config_path: str, register_path: str, output_file: st
         }
         
         # Output to file or stdout
+        output = _json_dumps(output_data)
         if output_file:
             try:
-                with open(output_file, 'w') as f:
-                    json.dump(output_data, f, indent=2)
+                with open(output_file, 'wb') as f:
+                    f.write(output)
                 logger.info(f"Saved configuration for inverter {serial} to {output_file}")
             except Exception as e:
                 logger.error(f"Error writing to output file: {e}")
                 # Fallback to stdout
-                json.dump(output_data, sys.stdout, indent=2)
+                sys.stdout.buffer.write(output)
         else:
-            json.dump(output_data, sys.stdout, indent=2)
+            sys.stdout.buffer.write(output)
 
 def main():
     parser = argparse.ArgumentParser(description='Backup inverter configurations')
@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
+import io
 import yaml
 import json
+from concurrent.futures import ThreadPoolExecutor
 import socket
 import struct
 import time
 import logging
-from typing import Dict, Any, List, Optional
+import sys
+from typing import Callable, Dict, Any, List, Optional, TextIO, Tuple
 from pathlib import Path
 
 # Configure logging
@@ -15,6 +20,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Packet header: magic, protocol, frame length, unknown, TCP function, datalog ID
+_PKT_HDR = struct.Struct('<2sHHBB10s')
+# Read request data section: source, function code, serial, register, count
+_PKT_DATA = struct.Struct('<BB10sHH')
+# Start of a read response after the header: data length, address, function code,
+# serial, register
+_RESP_DATA = struct.Struct('<HBB10sH')
+# Heartbeat: the header followed by a single zero byte
+_HEARTBEAT = struct.Struct('<2sHHBB10sB')
+_HEADER_LEN = _PKT_HDR.size
+_READ_DATA_LEN = _PKT_DATA.size
+# Per-request fields of a read request: register and count
+_REGISTER_OFFSET = _HEADER_LEN + 12
+_REG_RANGE = struct.Struct('<HH')
+
+# Per-register dump lines: type label, register, [shortname,] value, value (hex)[, decoded value]
+_REGISTER_LINE = "{} Register {:4d}: {:<30} = {:5d} (0x{:04x}) -> {}\n".format
+_UNKNOWN_LINE = "{} Register {:4d}: <unknown> = {:5d} (0x{:04x})\n".format
+
+# Messages for the error code at the start of a response's data section
+_ERRCODES = {
+    0x01: "Illegal function",
+    0x02: "Data address error",
+    0x03: "Data value out of bounds or wrong number of registers",
+}
+
 class EG4ModbusClient:
     """Custom Modbus client that handles EG4 protocol specifics."""
     def __init__(self, host: str, port: int = 8000, connect_timeout: float = 5.0, read_timeout: float = 30.0, delay_ms: int = 200, buffer_size: int = 16384):
@@ -22,19 +53,34 @@ class EG4ModbusClient:
         self.port = port
         self.connect_timeout = connect_timeout
         self.read_timeout = read_timeout
-        self.delay_ms = delay_ms
+        self.delay_ms = delay_ms  # Pause between reads while backing off after a failure
+        self.error_backoff = 2.0  # Seconds to keep pausing between reads after a failed read
+        self._last_error_ts = float('-inf')
         self.buffer_size = max(16384, buffer_size)  # Ensure minimum 16KB buffer
         self.sock = None
         self.datalog_id = bytearray(10)  # Initialize with zeros
         self.inverter_serial = bytearray(10)  # Initialize with zeros
         self.last_heartbeat = 0
+        # Holding/input read request templates and the (datalog ID, serial) they were built for
+        self._templates = None
+        self._template_ids = (None, None)
         self.logger = logging.getLogger(__name__)
         self.max_buffer_size = 65536  # 64KB max buffer size
+        # Receive buffer reused for every read; bytes between _rxstart and
+        # _rxend have been received but not yet consumed as part of a frame
+        self._rxbuf = bytearray(self.buffer_size)
+        self._rxview = memoryview(self._rxbuf)
+        self._rxstart = 0
+        self._rxend = 0
 
     def connect(self) -> bool:
         """Establish connection to the inverter."""
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Requests are tiny and each one waits for its reply, so send them immediately
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.max_buffer_size)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.max_buffer_size)
             self.sock.settimeout(self.connect_timeout)
             self.sock.connect((self.host, self.port))
             self.sock.settimeout(self.read_timeout)
@@ -48,6 +94,43 @@ class EG4ModbusClient:
         if self.sock:
             self.sock.close()
             self.sock = None
+        self._rxstart = self._rxend = 0
+
+    def _packet_templates(self) -> Tuple[bytearray, bytearray]:
+        """Return holding and input register read requests with the current IDs filled in.
+        
+        The templates are only rebuilt when the datalog ID or inverter serial
+        changes; build_packet copies one and patches in the register range.
+        """
+        datalog_id, inverter_serial = self._template_ids
+        if datalog_id != self.datalog_id or inverter_serial != self.inverter_serial:
+            datalog_id = bytes(self.datalog_id)
+            inverter_serial = bytes(self.inverter_serial)
+            templates = []
+            # (TCP function, function code): 0xc2/3 read holding registers, 0xc3/4 read input registers
+            for tcp_function, function_code in ((0xc2, 0x03), (0xc3, 0x04)):
+                template = bytearray(_HEADER_LEN + _READ_DATA_LEN)
+                _PKT_HDR.pack_into(
+                    template, 0,
+                    b'\xa1\x1a',  # Magic bytes
+                    0x01,  # Protocol version (1 for read)
+                    _READ_DATA_LEN + 12,  # Frame length (data_len + 12 for header)
+                    0x01,  # Unknown, always 1
+                    tcp_function,  # TCP function
+                    datalog_id,  # Datalog ID
+                )
+                _PKT_DATA.pack_into(
+                    template, _HEADER_LEN,
+                    0x00,  # Source (0=client)
+                    function_code,  # Function code
+                    inverter_serial,  # Inverter serial (10 bytes)
+                    0,  # Register address, set per request
+                    0,  # Register count, set per request
+                )
+                templates.append(template)
+            self._templates = tuple(templates)
+            self._template_ids = (datalog_id, inverter_serial)
+        return self._templates
 
     def build_packet(self, register_address: int, count: int, is_input: bool = False) -> bytearray:
         """Build a packet to read registers.
@@ -57,132 +140,146 @@ class EG4ModbusClient:
             count: Number of registers to read
             is_input: True for input registers, False for holding registers
         """
-        # Build data section
-        data = bytearray()
-        data.append(0x00)  # Source (0=client)
-        data.append(0x04 if is_input else 0x03)  # Function code (4=read input registers, 3=read holding registers)
-        data.extend(self.inverter_serial)  # Inverter serial (10 bytes)
-        
-        # Convert register address and count to bytes, ensuring they're in valid range
-        data.extend((register_address & 0xFFFF).to_bytes(2, byteorder='little'))  # Register address
-        data.extend((count & 0xFFFF).to_bytes(2, byteorder='little'))  # Register count
-        
-        # Calculate data section length
-        data_len = len(data)
-        self.logger.debug(f"Data section length: {data_len}")
-        self.logger.debug(f"Data section: {data.hex()}")
-        
-        # Build header
-        header = bytearray()
-        header.extend(b'\xa1\x1a')  # Magic bytes
-        header.extend((0x01).to_bytes(2, byteorder='little'))  # Protocol version (1 for read)
-        header.extend((data_len + 12).to_bytes(2, byteorder='little'))  # Frame length (data_len + 12 for header)
-        header.append(0x01)  # Unknown, always 1
-        header.append(0xc3 if is_input else 0xc2)  # TCP function (0xc3=read input registers, 0xc2=read holding registers)
-        header.extend(self.datalog_id)  # Datalog ID
+        packet = bytearray(self._packet_templates()[is_input])
+        _REG_RANGE.pack_into(packet, _REGISTER_OFFSET, register_address & 0xFFFF, count & 0xFFFF)
         
-        self.logger.debug(f"Header length: {len(header)}")
-        self.logger.debug(f"Header: {header.hex()}")
-        
-        packet = header + data
-        self.logger.debug(f"Full packet length: {len(packet)}")
-        self.logger.debug(f"Full packet: {packet.hex()}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Data section length: %d", _READ_DATA_LEN)
+            self.logger.debug("Data section: %s", packet[_HEADER_LEN:].hex())
+            self.logger.debug("Header length: %d", _HEADER_LEN)
+            self.logger.debug("Header: %s", packet[:_HEADER_LEN].hex())
+            self.logger.debug("Full packet length: %d", len(packet))
+            self.logger.debug("Full packet: %s", packet.hex())
         
         return packet
 
-    def read_response(self) -> Optional[bytearray]:
-        """Read response from the inverter."""
+    def _fill(self):
+        """Receive the next chunk from the socket into the read buffer."""
+        if self._rxstart == self._rxend:
+            self._rxstart = self._rxend = 0
+        elif self._rxend == len(self._rxbuf):
+            if self._rxstart == 0:
+                raise Exception(f"Frame exceeds {len(self._rxbuf)} byte receive buffer")
+            # Move the unconsumed bytes to the front to make room
+            pending = self._rxend - self._rxstart
+            self._rxbuf[:pending] = bytes(self._rxview[self._rxstart:self._rxend])
+            self._rxstart, self._rxend = 0, pending
+        n = self.sock.recv_into(self._rxview[self._rxend:])
+        if not n:
+            raise ConnectionError("Connection closed by inverter")
+        self._rxend += n
+
+    def _read_exact(self, n: int) -> bytes:
+        """Take exactly n bytes off the read buffer, receiving more as needed."""
+        while self._rxend - self._rxstart < n:
+            self._fill()
+        start = self._rxstart
+        self._rxstart = start + n
+        return bytes(self._rxview[start:start + n])
+
+    def _sync_to_magic(self):
+        """Discard buffered bytes until the read buffer starts with the magic bytes."""
+        while True:
+            while self._rxend - self._rxstart < 2:
+                self._fill()
+            # On a well-framed stream the next frame starts right at _rxstart
+            if self._rxbuf.startswith(b'\xa1\x1a', self._rxstart):
+                return
+            magic_pos = self._rxbuf.find(b'\xa1\x1a', self._rxstart, self._rxend)
+            if magic_pos != -1:
+                self.logger.warning(f"Skipping {magic_pos - self._rxstart} bytes before magic bytes")
+                self._rxstart = magic_pos
+                return
+            # Keep the last byte in case it is the first half of the magic bytes
+            self.logger.debug("Magic bytes not found in buffered data, reading more data")
+            self._rxstart = self._rxend - 1
+            self._fill()
+
+    def read_response(self) -> Optional[bytes]:
+        """Read response from the inverter.
+        
+        Returns None for heartbeats, timeouts and bad frames. Raises
+        ConnectionError if the connection is lost, since no later read can succeed.
+        """
+        debug = self.logger.isEnabledFor(logging.DEBUG)
         try:
-            # Read header
-            header = self.sock.recv(self.buffer_size)
-            if not header:
-                self.logger.error("No header received")
-                return None
+            # Skip to the start of the next frame, then read its fixed header
+            self._sync_to_magic()
+            header = self._read_exact(_HEADER_LEN)
                 
             # Log raw header for debugging
-            self.logger.debug(f"Raw header: {header.hex()}")
-            
-            # Try to find magic bytes in the response
-            magic_pos = header.find(b'\xa1\x1a')
-            if magic_pos == -1:
-                # If magic bytes not found, try reading more data
-                self.logger.debug("Magic bytes not found in initial header, reading more data")
-                more_data = self.sock.recv(self.buffer_size)  # Read more data
-                if more_data:
-                    header = header + more_data
-                    magic_pos = header.find(b'\xa1\x1a')
-                    if magic_pos == -1:
-                        self.logger.error("Magic bytes not found in extended response")
-                        self.logger.debug(f"Extended response: {header.hex()}")
-                        return None
-                    # Adjust header to start from magic bytes
-                    header = header[magic_pos:]
-                else:
-                    self.logger.error("No additional data received")
-                    return None
+            if debug:
+                self.logger.debug("Raw header: %s", header.hex())
             
             # Get frame length from 4 bytes after magic bytes
             frame_len = int.from_bytes(header[4:6], byteorder='little')
-            self.logger.debug(f"Frame length: {frame_len}")
+            self.logger.debug("Frame length: %d", frame_len)
             
             # Log function code and error code
             function_code = header[7]
             self.logger.info(f"Received function code: 0x{function_code:02x}")
             
+            # The frame length counts every byte after the length field itself
+            remaining = frame_len + 6 - _HEADER_LEN
+            
             # Check if this is a heartbeat packet (TCP function 0xc1)
             if function_code == 0xc1:
                 self.logger.info("Received heartbeat packet")
+                if remaining > 0:
+                    self._read_exact(remaining)  # Consume the rest of the heartbeat frame
                 # Extract datalog ID from header
                 datalog_id = header[8:18]
-                self.logger.debug(f"Heartbeat datalog ID: {datalog_id.decode()}")
+                if debug:
+                    self.logger.debug("Heartbeat datalog ID: %s", datalog_id.decode())
                 
                 # Build and send heartbeat response
-                response = bytearray()
-                response.extend(b'\xa1\x1a')  # Magic bytes
-                response.extend((2).to_bytes(2, byteorder='little'))  # Protocol version 2
-                response.extend((13).to_bytes(2, byteorder='little'))  # Frame length
-                response.append(1)  # Unknown
-                response.append(0xc1)  # TCP function (Heartbeat)
-                response.extend(datalog_id)  # Datalog ID
-                response.append(0)  # Zero byte for heartbeat
+                response = _HEARTBEAT.pack(
+                    b'\xa1\x1a',  # Magic bytes
+                    2,  # Protocol version 2
+                    13,  # Frame length
+                    1,  # Unknown
+                    0xc1,  # TCP function (Heartbeat)
+                    datalog_id,  # Datalog ID
+                    0,  # Zero byte for heartbeat
+                )
                 
-                self.logger.debug(f"Sending heartbeat response: {response.hex()}")
+                if debug:
+                    self.logger.debug("Sending heartbeat response: %s", response.hex())
                 self.sock.sendall(response)
                 return None
             
             # Read remaining data
-            remaining = frame_len - 8
             if remaining > 0:
-                data = self.sock.recv(self.buffer_size)
-                if not data:
-                    self.logger.error("No data received after header")
-                    return None
-                self.logger.debug(f"Received {len(data)} bytes of data")
+                data = self._read_exact(remaining)
+                self.logger.debug("Received %d bytes of data", len(data))
                 
                 # Log error code if present (first byte of data section)
                 if len(data) > 0:
                     error_code = data[0]
-                    error_msg = {
-                        0x01: "Illegal function",
-                        0x02: "Data address error",
-                        0x03: "Data value out of bounds or wrong number of registers"
-                    }.get(error_code, "Unknown error")
+                    error_msg = _ERRCODES.get(error_code, "Unknown error")
                     self.logger.info(f"Received error code: 0x{error_code:02x} ({error_msg})")
                     if error_code != 0:
                         self.logger.error(f"Error code indicates failure: 0x{error_code:02x} ({error_msg})")
                 
                 return data
             else:
-                self.logger.error("Invalid frame length: {frame_len}")
+                self.logger.error(f"Invalid frame length: {frame_len}")
                 return None
             
         except socket.timeout:
             self.logger.error("Timeout reading response")
             return None
+        except ConnectionError:
+            raise
         except Exception as e:
             self.logger.error(f"Error reading response: {e}")
             return None
 
+    def _pace(self):
+        """Wait delay_ms between reads, but only while recovering from a recent failed read."""
+        if time.monotonic() - self._last_error_ts < self.error_backoff:
+            time.sleep(self.delay_ms / 1000)  # Convert ms to seconds
+
     def read_registers(self, start_reg: int, count: int, is_input: bool = False) -> Optional[List[int]]:
         """Read registers from the inverter.
         
@@ -203,6 +300,7 @@ class EG4ModbusClient:
                 # Read the response
                 response = self.read_response()
                 if response is None:
+                    self._last_error_ts = time.monotonic()
                     retry_count += 1
                     if retry_count < max_retries:
                         self.logger.warning(f"Retry {retry_count}/{max_retries} for registers {start_reg}-{start_reg+count-1}")
@@ -213,27 +311,22 @@ class EG4ModbusClient:
                 if len(response) < 2:  # Need at least 2 bytes for a register value
                     raise Exception(f"Response too short: {len(response)} bytes")
                     
-                # Extract register values - each register is 2 bytes in little-endian order
-                values = []
-                num_registers = len(response) // 2
-                for i in range(num_registers):
-                    if i * 2 + 1 < len(response):
-                        value = int.from_bytes(response[i*2:i*2+2], byteorder='little')
-                        values.append(value)
+                values = _unpack_registers(response)
                 
-                # Add delay between reads
-                time.sleep(self.delay_ms / 1000)  # Convert ms to seconds
+                self._pace()
                 
                 return values
                 
             except socket.timeout:
                 self.logger.error(f"Timeout reading registers {start_reg}-{start_reg+count-1}")
+                self._last_error_ts = time.monotonic()
                 retry_count += 1
                 if retry_count < max_retries:
                     self.logger.warning(f"Retry {retry_count}/{max_retries} after timeout")
                     time.sleep(1)  # Wait before retry
             except Exception as e:
                 self.logger.error(f"Error reading registers {start_reg}-{start_reg+count-1}: {e}")
+                self._last_error_ts = time.monotonic()
                 retry_count += 1
                 if retry_count < max_retries:
                     self.logger.warning(f"Retry {retry_count}/{max_retries} after error")
@@ -241,96 +334,163 @@ class EG4ModbusClient:
                     
         return None
 
+    def read_registers_pipelined(self, requests: List[Tuple[int, int, bool]], window: int = 8) -> List[Optional[List[int]]]:
+        """Read several register blocks, keeping up to window requests in flight.
+        
+        Args:
+            requests: (start_reg, count, is_input) for each block to read
+            window: Maximum number of requests sent before reading their responses
+            
+        Returns:
+            The register values for each request, in request order. Responses are
+            matched to requests by function code and start register; any block
+            without a matching response is re-read on its own with read_registers,
+            on a new connection.
+        """
+        results = [None] * len(requests)
+        for base in range(0, len(requests), window):
+            batch = requests[base:base + window]
+            pending = {(0x04 if is_input else 0x03, start_reg & 0xFFFF): base + i
+                       for i, (start_reg, count, is_input) in enumerate(batch)}
+            self.logger.debug("Sending %d pipelined requests", len(batch))
+            try:
+                self.sock.sendall(b''.join(self.build_packet(start_reg, count, is_input)
+                                           for start_reg, count, is_input in batch))
+                deadline = time.monotonic() + self.read_timeout
+                while pending and time.monotonic() < deadline:
+                    response = self.read_response()
+                    if response is None or len(response) < _RESP_DATA.size:
+                        continue  # Heartbeat, timeout or error; keep waiting for the rest
+                    _, _, function_code, _, register = _RESP_DATA.unpack_from(response)
+                    index = pending.pop((function_code, register), None)
+                    if index is None:
+                        self.logger.warning(f"Ignoring unexpected response for register {register}")
+                        continue
+                    results[index] = _unpack_registers(response)
+            except ConnectionError as e:
+                self.logger.error(f"Connection lost during pipelined read: {e}")
+            except (socket.timeout, OSError) as e:
+                self.logger.error(f"Error during pipelined read: {e}")
+            if pending:
+                self._last_error_ts = time.monotonic()
+                # Late replies to this batch may still arrive on this connection, and
+                # read_registers takes the next frame as its own; reconnect so they can't
+                self.close()
+                if not self.connect():
+                    return results
+                
+            self._pace()
+            
+            # Fall back to one request at a time for anything that went missing
+            for index in sorted(pending.values()):
+                start_reg, count, is_input = requests[index]
+                self.logger.warning(f"No pipelined response for registers {start_reg}-{start_reg+count-1}, retrying")
+                results[index] = self.read_registers(start_reg, count, is_input)
+                
+        return results
+
+def _unpack_registers(response: bytes) -> List[int]:
+    """Split a response into register values - each register is 2 bytes in little-endian order."""
+    return list(struct.unpack_from(f'<{len(response) // 2}H', response))
+
+def _make_decoder(reg_def: Dict[str, Any]) -> Callable[[int], Any]:
+    """Build the function that decodes raw values for one register definition."""
+    display_as = reg_def.get('display_as')
+    if display_as == 'enum':
+        enum_map = {}
+        for enum_value in reg_def.get('enum_values', []):
+            enum_map.setdefault(enum_value['value'], enum_value['name'])
+        return lambda value: enum_map.get(value, value)
+    if display_as == 'flags':
+        flags = [(1 << flag['bit'], flag['name']) for flag in reg_def.get('flags', [])]
+        return lambda value: [name for mask, name in flags if value & mask]
+    if display_as == 'fields':
+        fields = [(field['name'], field['byte'] * 8) for field in reg_def.get('fields', [])]
+        return lambda value: {name: (value >> shift) & 0xFF for name, shift in fields}
+    # Apply unit scale
+    unit_scale = reg_def.get('unit_scale', 1.0)
+    return lambda value: value * unit_scale
+
 def decode_register_value(reg_def: Dict[str, Any], value: int) -> Any:
     """Decode a register value based on its definition."""
     if not reg_def:
         return value
-        
-    # Apply unit scale
-    scaled_value = value * reg_def.get('unit_scale', 1.0)
-    
-    # Handle different display types
-    if reg_def.get('display_as') == 'enum':
-        for enum_value in reg_def.get('enum_values', []):
-            if enum_value['value'] == value:
-                return enum_value['name']
-        return value
-    elif reg_def.get('display_as') == 'flags':
-        flags = []
-        for flag in reg_def.get('flags', []):
-            if value & (1 << flag['bit']):
-                flags.append(flag['name'])
-        return flags
-    elif reg_def.get('display_as') == 'fields':
-        fields = {}
-        for field in reg_def.get('fields', []):
-            byte_value = (value >> (field['byte'] * 8)) & 0xFF
-            fields[field['name']] = byte_value
-        return fields
-        
-    return scaled_value
+    decode = reg_def.get('_decode')
+    if decode is None:
+        decode = reg_def['_decode'] = _make_decoder(reg_def)
+    return decode(value)
 
-def get_register_definition(registers: Dict[str, Any], reg_type: str, reg_num: int) -> Optional[Dict[str, Any]]:
-    """Get register definition from schema."""
+def build_register_index(registers: Dict[str, Any]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """Index register definitions from the schema by (register_type, register_number)."""
+    reg_index = {}
     for reg_group in registers['registers']:
-        if reg_group['register_type'] == reg_type:
-            for reg in reg_group['register_map']:
-                if reg['register_number'] == reg_num:
-                    return reg
-    return None
+        for reg in reg_group['register_map']:
+            # The first definition of a register wins, as with a linear scan
+            reg_index.setdefault((reg_group['register_type'], reg['register_number']), reg)
+            reg['_decode'] = _make_decoder(reg)
+    return reg_index
 
-def read_inverter_data(client: EG4ModbusClient, registers: Dict[str, Any]) -> Dict[str, Any]:
-    """Read and decode all registers from inverter."""
+def _decode_block(values: List[int], start_reg: int, reg_type: str, label: str,
+                  reg_index: Dict[Tuple[str, int], Dict[str, Any]], data: Dict[str, Any],
+                  dump: bool = True) -> str:
+    """Decode one block of register values into data and return its dump lines.
+    
+    Lookups are bound to locals up front so the per-register work is the index
+    hit, the precomputed decoder call and, if dump is set, the formatting.
+    """
+    get_def = reg_index.get
+    lines = []
+    append = lines.append
+    for reg_num, value in enumerate(values, start_reg):
+        reg_def = get_def((reg_type, reg_num))
+        if reg_def:
+            decoded_value = reg_def['_decode'](value)
+            data[reg_def['shortname']] = {
+                'name': reg_def['name'],
+                'value': decoded_value,
+                'unit': reg_def.get('unit', ''),
+                'description': reg_def['description']
+            }
+            if dump:
+                append(_REGISTER_LINE(label, reg_num, reg_def['shortname'], value, value, decoded_value))
+        elif dump:
+            append(_UNKNOWN_LINE(label, reg_num, value, value))
+    return ''.join(lines)
+
+def read_inverter_data(client: EG4ModbusClient, reg_index: Dict[Tuple[str, int], Dict[str, Any]], out: Optional[TextIO] = None,
+                       window: int = 8, dump: bool = True) -> Dict[str, Any]:
+    """Read and decode all registers from inverter, printing each one to out (default stdout).
+    
+    Up to window block requests are kept in flight at once (see read_registers_pipelined).
+    With dump=False the registers are only decoded, not printed.
+    """
     data = {}
     block_size = 40  # Fixed block size of 40 registers
+    if out is None:
+        out = sys.stdout
     
-    # Read holding registers (0-1000)
-    logger.info("Reading holding registers...")
-    for start_reg in range(0, 1001, block_size):
-        logger.debug(f"Reading holding registers {start_reg}-{start_reg + block_size - 1}")
-        hold_values = client.read_registers(start_reg, block_size, is_input=False)
-        if hold_values:
-            for i, value in enumerate(hold_values):
-                reg_num = start_reg + i
-                reg_def = get_register_definition(registers, 'hold', reg_num)
-                if reg_def:
-                    decoded_value = decode_register_value(reg_def, value)
-                    data[reg_def['shortname']] = {
-                        'name': reg_def['name'],
-                        'value': decoded_value,
-                        'unit': reg_def.get('unit', ''),
-                        'description': reg_def['description']
-                    }
-                    print(f"Holding Register {reg_num:4d}: {reg_def['shortname']:<30} = {value:5d} (0x{value:04x}) -> {decoded_value}")
-                else:
-                    print(f"Holding Register {reg_num:4d}: <unknown> = {value:5d} (0x{value:04x})")
+    # Read holding then input registers (0-1000), pipelining the block requests
+    requests = [(start_reg, block_size, is_input)
+                for is_input in (False, True)
+                for start_reg in range(0, 1001, block_size)]
+    logger.info("Reading holding and input registers...")
+    results = client.read_registers_pipelined(requests, window)
     
-    # Read input registers (0-1000)
-    logger.info("Reading input registers...")
-    for start_reg in range(0, 1001, block_size):
-        logger.debug(f"Reading input registers {start_reg}-{start_reg + block_size - 1}")
-        input_values = client.read_registers(start_reg, block_size, is_input=True)
-        if input_values:
-            for i, value in enumerate(input_values):
-                reg_num = start_reg + i
-                reg_def = get_register_definition(registers, 'input', reg_num)
-                if reg_def:
-                    decoded_value = decode_register_value(reg_def, value)
-                    data[reg_def['shortname']] = {
-                        'name': reg_def['name'],
-                        'value': decoded_value,
-                        'unit': reg_def.get('unit', ''),
-                        'description': reg_def['description']
-                    }
-                    print(f"Input Register {reg_num:4d}: {reg_def['shortname']:<30} = {value:5d} (0x{value:04x}) -> {decoded_value}")
-                else:
-                    print(f"Input Register {reg_num:4d}: <unknown> = {value:5d} (0x{value:04x})")
+    for (start_reg, _, is_input), values in zip(requests, results):
+        if not values:
+            continue
+        reg_type, label = ('input', 'Input') if is_input else ('hold', 'Holding')
+        # One write per block rather than one print per register
+        lines = _decode_block(values, start_reg, reg_type, label, reg_index, data, dump)
+        if lines:
+            out.write(lines)
     
     return data
 
-def bcd_to_int(bcd: int) -> int:
-    """Convert a BCD value to integer."""
-    return ((bcd >> 4) * 10) + (bcd & 0x0F)
+def bcd_pair_to_ints(bcd: int) -> Tuple[int, int]:
+    """Convert both BCD bytes of a 16-bit register to integers, as (low byte, high byte)."""
+    return (((bcd >> 4) & 0x0F) * 10 + (bcd & 0x0F),
+            ((bcd >> 12) & 0x0F) * 10 + ((bcd >> 8) & 0x0F))
 
 def check_time_delta(client: EG4ModbusClient) -> Optional[float]:
     """Check the time delta between system and inverter time.
@@ -361,12 +521,11 @@ def check_time_delta(client: EG4ModbusClient) -> Optional[float]:
         # Register 14: [minute_high, minute_low, second_high, second_low]
         
         # Extract and decode each BCD value
-        year = bcd_to_int(values[0] & 0xFF) + (bcd_to_int((values[0] >> 8) & 0xFF) * 100)  # Years since 2000
-        month = bcd_to_int(values[1] & 0xFF)
-        day = bcd_to_int((values[1] >> 8) & 0xFF)
-        hour = bcd_to_int(values[2] & 0xFF)
-        minute = bcd_to_int((values[2] >> 8) & 0xFF)
-        second = bcd_to_int(values[3] & 0xFF)
+        year_low, year_high = bcd_pair_to_ints(values[0])
+        year = year_low + year_high * 100  # Years since 2000
+        month, day = bcd_pair_to_ints(values[1])
+        hour, minute = bcd_pair_to_ints(values[2])
+        second = bcd_pair_to_ints(values[3])[0]
         
         # Log decoded values for debugging
         logger.debug(f"Decoded time values: year={year}, month={month}, day={day}, hour={hour}, minute={minute}, second={second}")
@@ -391,7 +550,68 @@ def check_time_delta(client: EG4ModbusClient) -> Optional[float]:
         logger.error(f"Error checking time delta from holding registers: {e}")
         return None
 
+def process_inverter(inverter: Dict[str, Any], reg_index: Dict[Tuple[str, int], Dict[str, Any]], dump: bool = True) -> str:
+    """Read one inverter and return its register dump (if dump is set) and summary as text."""
+    host = inverter['host']
+    port = inverter.get('port', 8000)
+    delay_ms = inverter.get('delay_ms', 200)
+    window = max(1, inverter.get('pipeline_window', 8))
+    out = io.StringIO()
+    
+    logger.info(f"Connecting to inverter at {host}:{port}")
+    
+    client = EG4ModbusClient(host, port, delay_ms=delay_ms, buffer_size=256)
+    if not client.connect():
+        logger.error(f"Failed to connect to {host}:{port}")
+        return ''
+        
+    try:
+        # Check time delta first
+        time_diff = check_time_delta(client)
+        if time_diff is not None:
+            if abs(time_diff) > 600:  # More than 10 minutes difference
+                logger.warning(f"Large time difference detected for {host}: {time_diff:.1f} seconds")
+            elif abs(time_diff) > 30:  # More than 30 seconds difference
+                logger.warning(f"Significant time difference detected for {host}: {time_diff:.1f} seconds")
+        
+        # Read all registers
+        data = read_inverter_data(client, reg_index, out, window, dump)
+        
+        # Print summary
+        print(f"\nInverter {host} Summary:", file=out)
+        print("=" * 80, file=out)
+        for reg_name, reg_data in data.items():
+            print(f"{reg_name:<30} = {reg_data['value']} {reg_data['unit']}", file=out)
+            
+    except Exception as e:
+        logger.error(f"Error reading from {host}:{port}: {e}")
+    finally:
+        client.close()
+        logger.info(f"Connection to {host}:{port} closed")
+        
+    return out.getvalue()
+
+async def read_all_inverters(inverters: List[Dict[str, Any]], reg_index: Dict[Tuple[str, int], Dict[str, Any]],
+                             dump: bool = True):
+    """Read all inverters concurrently, printing each one's output as it finishes.
+    
+    Each inverter keeps its own blocking client on a worker thread, so slow
+    inverters overlap instead of adding up. The pool has one thread per
+    inverter; the default executor caps its size and would queue the rest.
+    """
+    if not inverters:
+        return
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=len(inverters)) as pool:
+        tasks = [loop.run_in_executor(pool, process_inverter, inverter, reg_index, dump) for inverter in inverters]
+        for task in asyncio.as_completed(tasks):
+            sys.stdout.write(await task)
+
 def main():
+    parser = argparse.ArgumentParser(description='Read and decode all registers from the configured inverters')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print each inverter\'s summary, not every register')
+    args = parser.parse_args()
+    
     # Load configuration
     config_path = Path('config.yaml')
     if not config_path.exists():
@@ -410,45 +630,9 @@ def main():
     with open(schema_path) as f:
         registers = json.load(f)
         
-    # Process each inverter
-    for inverter in config.get('inverters', []):
-        if not inverter.get('enabled', True):
-            continue
-            
-        host = inverter['host']
-        port = inverter.get('port', 8000)
-        delay_ms = inverter.get('delay_ms', 200)
-        
-        logger.info(f"Connecting to inverter at {host}:{port}")
-        
-        client = EG4ModbusClient(host, port, delay_ms=delay_ms, buffer_size=256)
-        if not client.connect():
-            logger.error(f"Failed to connect to {host}:{port}")
-            continue
-            
-        try:
-            # Check time delta first
-            time_diff = check_time_delta(client)
-            if time_diff is not None:
-                if abs(time_diff) > 600:  # More than 10 minutes difference
-                    logger.warning(f"Large time difference detected for {host}: {time_diff:.1f} seconds")
-                elif abs(time_diff) > 30:  # More than 30 seconds difference
-                    logger.warning(f"Significant time difference detected for {host}: {time_diff:.1f} seconds")
-            
-            # Read all registers
-            data = read_inverter_data(client, registers)
-            
-            # Print summary
-            print(f"\nInverter {host} Summary:")
-            print("=" * 80)
-            for reg_name, reg_data in data.items():
-                print(f"{reg_name:<30} = {reg_data['value']} {reg_data['unit']}")
-                
-        except Exception as e:
-            logger.error(f"Error reading from {host}:{port}: {e}")
-        finally:
-            client.close()
-            logger.info(f"Connection to {host}:{port} closed")
+    # Process the enabled inverters concurrently
+    inverters = [inverter for inverter in config.get('inverters', []) if inverter.get('enabled', True)]
+    asyncio.run(read_all_inverters(inverters, build_register_index(registers), not args.quiet))
 
 if __name__ == '__main__':
     main() 
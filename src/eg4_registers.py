@@ -2,14 +2,54 @@
 
 import json
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 import argparse
+import atexit
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+import hashlib
 import os
-import yaml
-from dataclasses import dataclass
-from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+import pickle
+from dataclasses import dataclass, field
 import sys
+import time
+
+# yaml and influxdb_client are imported where they are used, so runs that
+# don't write to InfluxDB don't pay for loading the client
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps_indented(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps_indented(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+# Points (line protocol lines) per InfluxDB write request
+INFLUX_BATCH_SIZE = 5000
+# Seconds before a partial batch is sent anyway
+INFLUX_FLUSH_INTERVAL = 10.0
+
+# Datalog entries handed to each worker task with --jobs
+DECODE_CHUNK_SIZE = 1000
+
+# Line protocol escaping for tag values and field keys
+_LP_ESCAPE = str.maketrans({',': '\\,', ' ': '\\ ', '=': '\\='})
+
+# Parsed value per register hex string ("0x1234"); only up to 16-bit values
+# are kept so the table stays bounded
+_hex_values: Dict[str, int] = {}
+
+# Escaped "measurement,tags " prefix per (serial, datalog)
+_lp_prefixes: Dict[Tuple[str, str], bytes] = {}
+
+# Bump when the pickled Register/RegisterMap layout changes
+REGISTER_CACHE_VERSION = 5
 
 @dataclass
 class InfluxConfig:
@@ -27,113 +67,267 @@ class Config:
     human_timestamps: bool = False
     show_unknown: bool = False
 
-def write_to_influx(config: InfluxConfig, points: List[Point]) -> bool:
-    """Write points to InfluxDB"""
-    try:
-        client = InfluxDBClient(
-            url=config.url,
-            token=f"{config.username}:{config.password}",
+class InfluxSink:
+    """Long-lived InfluxDB line protocol writer
+    
+    Lines are buffered and sent a batch at a time with a synchronous write, so
+    every failed batch is seen and counted. The client is created on first
+    flush and kept open; close() sends whatever is still pending.
+    """
+    def __init__(self, config: InfluxConfig):
+        self.config = config
+        self.client = None
+        self.write_api = None
+        self.written = 0
+        self.failed = False
+        self._lines = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+    
+    def _open(self):
+        from influxdb_client import InfluxDBClient
+        from influxdb_client import WritePrecision
+        from influxdb_client.client.write_api import SYNCHRONOUS
+        
+        self.precision = WritePrecision.NS
+        self.client = InfluxDBClient(
+            url=self.config.url,
+            token=f"{self.config.username}:{self.config.password}",
             org="-"
         )
-        write_api = client.write_api(write_options=SYNCHRONOUS)
-        
-        # Write all points
-        write_api.write(bucket=config.database, record=points)
-        
-        # Clean up
-        write_api.close()
-        client.close()
-        return True
-    except Exception as e:
-        print(f"Error writing to InfluxDB: {e}")
-        return False
+        # Each record handed over is already a full batch of lines, so write it
+        # directly; the batching API would swallow errors in its background thread
+        self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+        atexit.register(self.close)
+    
+    def write_lp(self, data: bytes, count: int = 1):
+        """Buffer count line protocol lines, sending a batch when full or old enough"""
+        self._lines.append(data)
+        self._pending += count
+        if self._pending >= INFLUX_BATCH_SIZE or time.monotonic() - self._last_flush >= INFLUX_FLUSH_INTERVAL:
+            self.flush()
+    
+    def flush(self) -> bool:
+        """Write the buffered lines to InfluxDB; False if any write failed"""
+        self._last_flush = time.monotonic()
+        if not self._lines:
+            return not self.failed
+        lines, self._lines = self._lines, []
+        count, self._pending = self._pending, 0
+        try:
+            if self.write_api is None:
+                self._open()
+            self.write_api.write(bucket=self.config.database, record=b"".join(lines),
+                                 write_precision=self.precision)
+            self.written += count
+        except Exception as e:
+            print(f"Error writing to InfluxDB: {e}")
+            self.failed = True
+        return not self.failed
+    
+    def close(self):
+        """Flush pending batches and close the connection"""
+        self.flush()
+        if self.write_api is not None:
+            self.write_api.close()
+            self.write_api = None
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+def entry_to_line_protocol(entry: 'DatalogEntry', decoded: Dict[str, Union[int, float]]) -> bytes:
+    """Format a datalog entry's decoded values as one InfluxDB line protocol line"""
+    key = (entry.serial, entry.datalog)
+    prefix = _lp_prefixes.get(key)
+    if prefix is None:
+        prefix = _lp_prefixes[key] = (
+            f"eg4_inverter,serial={entry.serial.translate(_LP_ESCAPE)},"
+            f"datalog={entry.datalog.translate(_LP_ESCAPE)} "
+        ).encode()
+    fields = ",".join(
+        f"{name.translate(_LP_ESCAPE)}={value}i" if isinstance(value, int) else f"{name.translate(_LP_ESCAPE)}={value}"
+        for name, value in decoded.items()
+    )
+    return b"%s%s %d\n" % (prefix, fields.encode(), entry.utc_timestamp * 1_000_000_000)
+
+def _cache_dir() -> str:
+    """Per-user cache directory for parsed config and register files"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'eg4')
+
+def _load_yaml_cached(config_file: str):
+    """Parse a YAML file, reusing a JSON copy of it while the file is unchanged
+    
+    The copy holds credentials, so it is written readable by the owner only.
+    """
+    st = os.stat(config_file)
+    stamp = [st.st_mtime_ns, st.st_size]
+    path_hash = hashlib.sha1(os.path.abspath(config_file).encode()).hexdigest()
+    cache_path = os.path.join(_cache_dir(), f"config_{path_hash}.json")
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = _json_loads(f.read())
+        if cached['stamp'] == stamp:
+            return cached['config']
+    except Exception:
+        pass  # Missing, stale or unreadable cache, parse the file
+    
+    import yaml
+    try:
+        loader = yaml.CSafeLoader
+    except AttributeError:
+        loader = yaml.SafeLoader
+    with open(config_file, 'r') as f:
+        config = yaml.load(f, Loader=loader)
+    
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        fd = os.open(cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w') as f:
+            json.dump({'stamp': stamp, 'config': config}, f)
+    except (OSError, TypeError, ValueError):
+        pass  # Not JSON-representable or not writable, just don't cache
+    return config
 
 def load_config(config_file: str) -> Optional[Config]:
     """Load configuration from YAML file"""
     try:
-        with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
-            
-            # Load InfluxDB config if enabled
-            influx_config = None
-            influx_section = config.get('influx', {})
-            if influx_section.get('enabled', True):
-                influx_config = InfluxConfig(
-                    url=influx_section.get('url', 'http://localhost:8086'),
-                    username=influx_section.get('username', ''),
-                    password=influx_section.get('password', ''),
-                    database=influx_section.get('database', 'eg4_data')
-                )
-            
-            # Load file paths
-            datalog_file = config.get('datalog_file')
-            register_file = config.get('register_file')
-            
-            if not register_file:
-                print("Error: register_file must be specified in config")
-                return None
-                
-            return Config(
-                influx=influx_config,
-                datalog_file=datalog_file,
-                register_file=register_file,
-                verbose=config.get('verbose', False),
-                human_timestamps=config.get('human_timestamps', False),
-                show_unknown=config.get('show_unknown', False)
+        config = _load_yaml_cached(config_file)
+        
+        # Load InfluxDB config if enabled
+        influx_config = None
+        influx_section = config.get('influx', {})
+        if influx_section.get('enabled', True):
+            influx_config = InfluxConfig(
+                url=influx_section.get('url', 'http://localhost:8086'),
+                username=influx_section.get('username', ''),
+                password=influx_section.get('password', ''),
+                database=influx_section.get('database', 'eg4_data')
             )
+        
+        # Load file paths
+        datalog_file = config.get('datalog_file')
+        register_file = config.get('register_file')
+        
+        if not register_file:
+            print("Error: register_file must be specified in config")
+            return None
+            
+        return Config(
+            influx=influx_config,
+            datalog_file=datalog_file,
+            register_file=register_file,
+            verbose=config.get('verbose', False),
+            human_timestamps=config.get('human_timestamps', False),
+            show_unknown=config.get('show_unknown', False)
+        )
     except Exception as e:
         print(f"Warning: Could not load config file: {e}")
         return None
 
+def _hex_to_int(hex_value: str) -> int:
+    """int(hex_value, 16) through the shared _hex_values memo"""
+    value = _hex_values.get(hex_value)
+    if value is None:
+        value = int(hex_value, 16)
+        if len(hex_value) <= 6:
+            _hex_values[hex_value] = value
+    return value
+
+@dataclass(slots=True, frozen=True)
 class Register:
-    def __init__(self, number: int, name: str, description: str, data_type: str, 
-                 access: str, scaling: float = 1.0, unit: str = ""):
-        self.number = number
-        self.name = name
-        self.description = description
-        self.data_type = data_type
-        self.access = access
-        self.scaling = scaling
-        self.unit = unit
+    number: int
+    name: str
+    description: str
+    data_type: str
+    access: str
+    scaling: float = 1.0
+    unit: str = ""
+    is_float: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'is_float', self.data_type == "float")
 
     def decode_value(self, hex_value: str) -> Union[int, float]:
         """Decode a hex string value based on the register's data type"""
-        value = int(hex_value, 16)
-        if self.data_type == "float":
+        value = _hex_to_int(hex_value)
+        if self.is_float:
             return value * self.scaling
         return value
 
 class RegisterMap:
     def __init__(self, registers: List[Register]):
         self.registers = {reg.number: reg for reg in registers}
+        self.by_name = {reg.name: reg for reg in self.registers.values()}
+        # Keyed by register number as it appears in raw_data: the name to
+        # decode into and the scaling to apply (None if used as-is)
+        self._decode_table = {
+            str(reg.number): (reg.name, reg.scaling if reg.is_float else None)
+            for reg in self.registers.values()
+        }
         
     def get_register(self, number: int) -> Optional[Register]:
         return self.registers.get(number)
     
+    def unit_suffixes(self, verbose: bool = False) -> Dict[str, str]:
+        """Output suffix per register name: " <unit>" if verbose and it has one, else empty"""
+        return {name: f" {reg.unit}" if reg.unit and verbose else "" for name, reg in self.by_name.items()}
+    
     def decode_registers(self, raw_data: Dict[str, str], show_unknown: bool = False, register_type: str = "unknown") -> Dict[str, Union[int, float]]:
         """Decode a dictionary of raw register values"""
         decoded = {}
+        decode_table = self._decode_table
+        hex_values = _hex_values
+        unknown_prefix = f"{register_type}_unknown_"
         for reg_num, hex_value in raw_data.items():
-            reg = self.get_register(int(reg_num))
-            if reg:
-                decoded[reg.name] = reg.decode_value(hex_value)
-            elif show_unknown:
-                decoded[f"{register_type}_unknown_{reg_num}"] = int(hex_value, 16)
+            spec = decode_table.get(reg_num)
+            if spec is None and not show_unknown:
+                continue
+            # _hex_to_int, inlined
+            value = hex_values.get(hex_value)
+            if value is None:
+                value = int(hex_value, 16)
+                if len(hex_value) <= 6:
+                    hex_values[hex_value] = value
+            if spec is not None:
+                name, scaling = spec
+                decoded[name] = value if scaling is None else value * scaling
+            else:
+                decoded[unknown_prefix + reg_num] = value
         return decoded
 
 class DatalogEntry:
+    __slots__ = ("datalog", "raw_data", "register_type", "serial", "utc_timestamp", "_timestamp", "_decoded")
+
     def __init__(self, datalog: str, raw_data: Dict[str, str], 
                  register_type: str, serial: str, utc_timestamp: int):
         self.datalog = datalog
         self.raw_data = raw_data
         self.register_type = register_type
         self.serial = serial
-        self.timestamp = datetime.fromtimestamp(utc_timestamp)
+        self.utc_timestamp = utc_timestamp
+        self._timestamp = None
+        self._decoded = None  # (register_map, show_unknown, decoded values) of the last decode
+
+    @property
+    def timestamp(self) -> datetime:
+        """Local time of the entry, built on first use"""
+        if self._timestamp is None:
+            self._timestamp = datetime.fromtimestamp(self.utc_timestamp)
+        return self._timestamp
 
     @classmethod
     def from_json(cls, json_str: str) -> 'DatalogEntry':
         """Create a DatalogEntry from a JSON string"""
-        data = json.loads(json_str)
+        return cls._from_data(_json_loads(json_str))
+
+    @classmethod
+    def from_json_bytes(cls, json_bytes: bytes) -> 'DatalogEntry':
+        """Create a DatalogEntry from a JSON line read in binary mode"""
+        return cls._from_data(_json_loads(json_bytes))
+
+    @classmethod
+    def _from_data(cls, data: dict) -> 'DatalogEntry':
         return cls(
             datalog=data['datalog'],
             raw_data=data['raw_data'],
@@ -143,24 +337,199 @@ class DatalogEntry:
         )
 
     def decode_values(self, register_map: RegisterMap, show_unknown: bool = False) -> Dict[str, Union[int, float]]:
-        """Decode the raw register values using the provided register map"""
-        return register_map.decode_registers(self.raw_data, show_unknown, self.register_type)
+        """Decode the raw register values using the provided register map
+        
+        The result is kept on the entry and returned again for the same map and
+        show_unknown, so callers must not modify it.
+        """
+        cached = self._decoded
+        if cached is not None and cached[0] is register_map and cached[1] == show_unknown:
+            return cached[2]
+        decoded = register_map.decode_registers(self.raw_data, show_unknown, self.register_type)
+        self._decoded = (register_map, show_unknown, decoded)
+        return decoded
+
+def iter_datalog_file(filepath: str) -> Iterator[DatalogEntry]:
+    """Parse a datalog.json file one entry at a time"""
+    with open(filepath, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield DatalogEntry.from_json_bytes(line)
 
 def load_datalog_file(filepath: str) -> List[DatalogEntry]:
     """Load and parse a datalog.json file"""
-    entries = []
-    with open(filepath, 'r') as f:
+    return list(iter_datalog_file(filepath))
+
+def format_entry(entry: DatalogEntry, decoded: Dict[str, Union[int, float]], human_timestamps: bool,
+                 unit_suffixes: Dict[str, str]) -> str:
+    """Format an entry's decoded values as output text, one line per register"""
+    timestamp = entry.timestamp.strftime('%Y-%m-%d %H:%M:%S') if human_timestamps else entry.utc_timestamp
+    prefix = f"{timestamp} com.eg4electronics.inverter.{entry.serial}.{entry.datalog}."
+    return "".join([f"{prefix}{name}: {value}{unit_suffixes.get(name, ' (undefined)')}\n" for name, value in decoded.items()])
+
+def iter_datalog_chunks(filepath: str, size: int) -> Iterator[List[bytes]]:
+    """Read a datalog.json file as lists of up to size raw JSON lines"""
+    chunk = []
+    with open(filepath, 'rb') as f:
         for line in f:
             if line.strip():
-                entries.append(DatalogEntry.from_json(line))
-    return entries
+                chunk.append(line)
+                if len(chunk) >= size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+# Per-process state for decode workers, set by _init_decode_worker
+_worker_register_map: Optional['RegisterMap'] = None
+_worker_show_unknown = False
+_worker_human_timestamps = False
+_worker_unit_suffixes: Dict[str, str] = {}
+
+def _init_decode_worker(register_map: 'RegisterMap', show_unknown: bool, human_timestamps: bool,
+                        unit_suffixes: Dict[str, str]):
+    global _worker_register_map, _worker_show_unknown, _worker_human_timestamps, _worker_unit_suffixes
+    _worker_register_map = register_map
+    _worker_show_unknown = show_unknown
+    _worker_human_timestamps = human_timestamps
+    _worker_unit_suffixes = unit_suffixes
+
+def _decode_to_lp_chunk(lines: List[bytes]) -> Tuple[bytes, int]:
+    """Decode raw datalog lines into a line protocol blob and its line count"""
+    out = []
+    for line in lines:
+        entry = DatalogEntry.from_json_bytes(line)
+        decoded = entry.decode_values(_worker_register_map, _worker_show_unknown)
+        if decoded:
+            out.append(entry_to_line_protocol(entry, decoded))
+    return b"".join(out), len(out)
+
+def _decode_to_text_chunk(lines: List[bytes]) -> Tuple[str, int]:
+    """Decode raw datalog lines into formatted output text and its entry count"""
+    out = []
+    for line in lines:
+        entry = DatalogEntry.from_json_bytes(line)
+        decoded = entry.decode_values(_worker_register_map, _worker_show_unknown)
+        out.append(format_entry(entry, decoded, _worker_human_timestamps, _worker_unit_suffixes))
+    return "".join(out), len(out)
+
+def map_datalog_chunks(filepaths: List[str], task: Callable[[List[bytes]], Tuple[Any, int]], jobs: int,
+                       register_map: 'RegisterMap', show_unknown: bool, human_timestamps: bool = False,
+                       unit_suffixes: Optional[Dict[str, str]] = None) -> Iterator[Tuple[Any, int]]:
+    """Run task over chunks of the datalog files on jobs worker processes, in file order
+    
+    task is _decode_to_lp_chunk or _decode_to_text_chunk. At most two chunks per
+    worker are in flight, so the files are never read far ahead of the consumer.
+    """
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_decode_worker,
+                             initargs=(register_map, show_unknown, human_timestamps, unit_suffixes or {})) as pool:
+        pending = deque()
+        chunks = chain.from_iterable(iter_datalog_chunks(path, DECODE_CHUNK_SIZE) for path in filepaths)
+        for chunk in chunks:
+            pending.append(pool.submit(task, chunk))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _register_cache_path(digest: str) -> str:
+    """Path of the pickled RegisterMap for a register file with the given content digest"""
+    return os.path.join(_cache_dir(), f"regmap_v{REGISTER_CACHE_VERSION}_{digest}.pkl")
+
+def _validated_register_path() -> str:
+    """Sidecar recording the digest of the last register file that passed validation"""
+    return os.path.join(_cache_dir(), "regmap_ok.json")
+
+def _is_validated_register_file(digest: str) -> bool:
+    try:
+        with open(_validated_register_path(), 'rb') as f:
+            return _json_loads(f.read()).get('validated_hash') == digest
+    except Exception:
+        return False
+
+def _mark_validated_register_file(digest: str):
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        with open(_validated_register_path(), 'w') as f:
+            json.dump({'validated_hash': digest}, f)
+    except OSError:
+        pass
+
+def _register_shortname(reg_type: str, reg_number: int, reg_data: dict) -> str:
+    """Shortname of a register definition, type-based if none provided"""
+    return reg_data.get('shortname') or f"{reg_type}-{reg_number}"
+
+def _make_register(reg_number: int, shortname: str, reg_data: dict) -> Register:
+    """Build a Register from its JSON definition"""
+    get = reg_data.get
+    
+    # Convert unit_scale to float if present, otherwise use 1.0
+    unit_scale = get('unit_scale')
+    try:
+        scaling = 1.0 if unit_scale is None else float(unit_scale)
+    except (ValueError, TypeError):
+        scaling = 1.0
+    
+    # data_type and unit repeat across most registers, so share one copy of each
+    data_type = get('datatype', 'uint16')  # Default to uint16 if not specified
+    unit = get('unit', '')
+    return Register(
+        number=reg_number,
+        name=shortname,
+        description=get('description') or '',
+        data_type=sys.intern(data_type) if isinstance(data_type, str) else data_type,
+        access='read_only' if get('read_only') == 'true' else 'read_write',
+        scaling=scaling,
+        unit=sys.intern(unit) if isinstance(unit, str) else unit
+    )
+
+def _save_register_cache(cache_path: str, register_map: RegisterMap):
+    """Pickle a RegisterMap for later runs; failures just leave the cache cold"""
+    tmp_path = f"{cache_path}.{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(register_map, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
 
 def load_register_map(filepath: str) -> RegisterMap:
-    """Load register definitions from a JSON file"""
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    """Load register definitions from a JSON file
+    
+    A map that validated without warnings is cached keyed by the file's
+    content, so unchanged register files skip parsing and duplicate checks,
+    and skip the checks even if that cache is lost.
+    """
+    with open(filepath, 'rb') as f:
+        content = f.read()
+    
+    digest = hashlib.blake2b(content, digest_size=8).hexdigest()
+    cache_path = _register_cache_path(digest)
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass  # Missing or unreadable cache, parse the file
+    
+    data = _json_loads(content)
     
     registers = []
+    if _is_validated_register_file(digest):
+        append, make_register, register_shortname = registers.append, _make_register, _register_shortname
+        for register_type in data.get('registers', []):
+            reg_type = register_type.get('register_type', 'unknown').lower()
+            for reg_data in register_type.get('register_map', []):
+                reg_number = reg_data['register_number']
+                append(make_register(reg_number, register_shortname(reg_type, reg_number, reg_data), reg_data))
+        register_map = RegisterMap(registers)
+        _save_register_cache(cache_path, register_map)
+        return register_map
+    
+    clean = True  # No warnings, so later loads can skip validation
     type_registers = {}  # Track registers by type for duplicate checking
     shortnames = {}  # Track shortnames across all types
     register_entries = {}  # Track full register entries for duplicate checking
@@ -177,6 +546,7 @@ def load_register_map(filepath: str) -> RegisterMap:
                 reg_number = reg_data.get('register_number')
                 if reg_number is None:
                     print(f"Warning: Skipping register with missing register_number: {reg_data}")
+                    clean = False
                     continue
                 
                 # Check for duplicate entries in the JSON file
@@ -190,23 +560,16 @@ def load_register_map(filepath: str) -> RegisterMap:
                     })
                     continue
                 
-                # Convert unit_scale to float if present, otherwise use 1.0
-                try:
-                    scaling = float(reg_data.get('unit_scale', 1.0))
-                except (ValueError, TypeError):
-                    scaling = 1.0
-                
-                # Use type-based shortname if none provided
-                shortname = reg_data.get('shortname')
-                if not shortname:
-                    shortname = f"{reg_type}-{reg_number}"
+                shortname = _register_shortname(reg_type, reg_number, reg_data)
+                description = reg_data.get('description') or ''
                 
                 # Check for duplicate register numbers within type
                 if reg_number in type_registers[reg_type]:
                     existing = type_registers[reg_type][reg_number]
                     print(f"Error: Register number {reg_number} is defined multiple times in type '{reg_type}':")
                     print(f"  - First: {existing['description']} ({existing['shortname']})")
-                    print(f"  - Second: {reg_data.get('description', '')} ({shortname})")
+                    print(f"  - Second: {description} ({shortname})")
+                    clean = False
                     continue
                 
                 # Check for duplicate shortnames across all types - collect instead of exiting
@@ -221,7 +584,7 @@ def load_register_map(filepath: str) -> RegisterMap:
                 
                 # Store register info for duplicate checking
                 type_registers[reg_type][reg_number] = {
-                    'description': reg_data.get('description', ''),
+                    'description': description,
                     'shortname': shortname
                 }
                 shortnames[shortname] = {
@@ -230,18 +593,10 @@ def load_register_map(filepath: str) -> RegisterMap:
                 }
                 register_entries[entry_key] = reg_data
                 
-                reg = Register(
-                    number=reg_number,
-                    name=shortname,
-                    description=reg_data.get('description', ''),
-                    data_type=reg_data.get('datatype', 'uint16'),  # Default to uint16 if not specified
-                    access='read_only' if reg_data.get('read_only') == 'true' else 'read_write',
-                    scaling=scaling,
-                    unit=reg_data.get('unit', '')
-                )
-                registers.append(reg)
+                registers.append(_make_register(reg_number, shortname, reg_data))
             except Exception as e:
                 print(f"Warning: Error processing register data: {e}\nData: {reg_data}")
+                clean = False
                 continue
     
     # Report all duplicates found
@@ -251,8 +606,8 @@ def load_register_map(filepath: str) -> RegisterMap:
         print("\nFatal Error: Found duplicate register entries:")
         for dup in duplicate_entries:
             print(f"\nDuplicate entry found for {dup['key']}:")
-            print(f"  - First occurrence: {json.dumps(dup['first'], indent=2)}")
-            print(f"  - Second occurrence: {json.dumps(dup['second'], indent=2)}")
+            print(f"  - First occurrence: {_json_dumps_indented(dup['first'])}")
+            print(f"  - Second occurrence: {_json_dumps_indented(dup['second'])}")
         has_errors = True
     
     if duplicate_shortnames:
@@ -269,15 +624,21 @@ def load_register_map(filepath: str) -> RegisterMap:
     
     if not registers:
         print("Warning: No valid registers were loaded from the file")
+        return RegisterMap(registers)
     
-    return RegisterMap(registers)
+    register_map = RegisterMap(registers)
+    # Only cache a map that loaded without warnings, so they are shown every run
+    if clean:
+        _mark_validated_register_file(digest)
+        _save_register_cache(cache_path, register_map)
+    return register_map
 
 # Example usage:
 if __name__ == "__main__":
     # Set up command line argument parsing
     parser = argparse.ArgumentParser(description='Process EG4 datalog entries')
-    parser.add_argument('-f', '--datalog-file',
-                      help='Path to the datalog.json file (overrides config)')
+    parser.add_argument('-f', '--datalog-file', action='append',
+                      help='Path to the datalog.json file (overrides config, may be repeated)')
     parser.add_argument('-s', '--register-file',
                       help='Path to the eg4_registers.json file (overrides config)')
     parser.add_argument('-v', '--verbose', action='store_true',
@@ -288,6 +649,8 @@ if __name__ == "__main__":
                       help='Show undefined registers in output (overrides config)')
     parser.add_argument('--influx', action='store_true',
                       help='Output in InfluxDB line protocol format')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                      help='Worker processes for decoding datalogs (0: one per CPU, default: 1)')
     parser.add_argument('--config', default='config.yaml',
                       help='Path to configuration file (default: config.yaml)')
     
@@ -300,8 +663,7 @@ if __name__ == "__main__":
         exit(1)
     
     # Override config with command line arguments
-    if args.datalog_file:
-        config.datalog_file = args.datalog_file
+    datalog_files = args.datalog_file or ([config.datalog_file] if config.datalog_file else [])
     if args.register_file:
         config.register_file = args.register_file
     if args.verbose:
@@ -319,52 +681,60 @@ if __name__ == "__main__":
     # Load register definitions
     register_map = load_register_map(config.register_file)
     
-    # Only process datalog if it's defined
-    if config.datalog_file:
-        # Verify datalog file exists
-        if not os.path.exists(config.datalog_file):
-            print(f"Error: Datalog file '{config.datalog_file}' not found")
-            exit(1)
+    # Only process datalogs if any are defined
+    if datalog_files:
+        # Verify datalog files exist
+        for datalog_file in datalog_files:
+            if not os.path.exists(datalog_file):
+                print(f"Error: Datalog file '{datalog_file}' not found")
+                exit(1)
             
-        # Load datalog entries
-        entries = load_datalog_file(config.datalog_file)
+        sink = InfluxSink(config.influx) if args.influx and config.influx else None
+        unit_strs = register_map.unit_suffixes(config.verbose)
+        jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
         
-        # Process each entry
-        points = []  # Collect points for batch writing
-        for entry in entries:
-            # Decode register values
-            decoded_values = entry.decode_values(register_map, config.show_unknown)
-            
-            # Print decoded values
-            for name, value in decoded_values.items():
-                reg = next((r for r in register_map.registers.values() if r.name == name), None)
-                if reg:
-                    unit_str = f" {reg.unit}" if reg.unit and config.verbose else ""
-                else:
-                    unit_str = " (undefined)"
-                timestamp = entry.timestamp.strftime('%Y-%m-%d %H:%M:%S') if config.human_timestamps else int(entry.timestamp.timestamp())
+        if jobs > 1 and sink is not None:
+            # Decode on worker processes; they hand back line protocol in file order
+            for data, count in map_datalog_chunks(datalog_files, _decode_to_lp_chunk, jobs,
+                                                  register_map, config.show_unknown):
+                if count:
+                    sink.write_lp(data, count)
+                    if config.verbose:
+                        sys.stdout.write(data.decode())
+        elif jobs > 1:
+            # Decode and format on worker processes; they hand back output text in file order
+            for text, _ in map_datalog_chunks(datalog_files, _decode_to_text_chunk, jobs, register_map,
+                                              config.show_unknown, config.human_timestamps, unit_strs):
+                sys.stdout.write(text)
+        else:
+            # Process each entry as it is read
+            for entry in chain.from_iterable(map(iter_datalog_file, datalog_files)):
+                # Decode register values
+                decoded_values = entry.decode_values(register_map, config.show_unknown)
                 
-                if args.influx and config.influx:
-                    # Create InfluxDB point
-                    point = Point("eg4_inverter") \
-                        .tag("serial", entry.serial) \
-                        .tag("datalog", entry.datalog) \
-                        .field(name, value) \
-                        .time(entry.timestamp)
-                    points.append(point)
+                if sink is not None:
+                    if not decoded_values:
+                        continue
+                    
+                    # One line protocol line per entry carrying all of its fields
+                    line = entry_to_line_protocol(entry, decoded_values)
+                    sink.write_lp(line)
                     
                     # Also print to stdout if verbose
                     if config.verbose:
-                        print(f"eg4_inverter,serial={entry.serial},datalog={entry.datalog} {name}={value} {int(entry.timestamp.timestamp() * 1e9)}")
-                else:
-                    print(f"{timestamp} com.eg4electronics.inverter.{entry.serial}.{entry.datalog}.{name}: {value}{unit_str}")
+                        print(line.decode(), end="")
+                    continue
+                
+                # Print decoded values, one write per entry
+                sys.stdout.write(format_entry(entry, decoded_values, config.human_timestamps, unit_strs))
         
-        # Write all points to InfluxDB if enabled
-        if args.influx and config.influx and points:
-            if write_to_influx(config.influx, points):
-                print(f"Successfully wrote {len(points)} points to InfluxDB")
-            else:
+        # Send whatever is still buffered for InfluxDB
+        if sink is not None:
+            sink.close()
+            if sink.failed:
                 print("Failed to write points to InfluxDB")
+            elif sink.written:
+                print(f"Successfully wrote {sink.written} points to InfluxDB")
     else:
         print("No datalog file specified, skipping datalog processing")
 